@@ -7,7 +7,10 @@ from obspy.core import Stream, UTCDateTime
 from algorithm import algorithms
 from PlotTimeseriesFactory import PlotTimeseriesFactory
 from StreamTimeseriesFactory import StreamTimeseriesFactory
+from MissingUrlCache import MissingUrlCache
 import TimeseriesUtility
+from UrlCache import UrlCache
+import Util
 
 # factory packages
 import binlog
@@ -286,6 +289,9 @@ def get_input_factory(args):
     elif args.input_url is not None:
         input_factory_args['urlInterval'] = args.input_url_interval
         input_factory_args['urlTemplate'] = args.input_url
+        input_factory_args['urlWorkers'] = args.input_url_workers
+        input_factory_args['parseWorkers'] = args.input_parse_workers
+        input_factory_args['missingUrlCache'] = args.missing_url_cache
 
     input_type = args.input
     if input_type == 'edge':
@@ -351,6 +357,7 @@ def get_output_factory(args):
     elif args.output_url is not None:
         output_url = args.output_url
         output_factory_args['urlInterval'] = args.output_url_interval
+        output_factory_args['missingUrlCache'] = args.missing_url_cache
         output_factory_args['urlTemplate'] = output_url
 
     output_type = args.output
@@ -470,6 +477,20 @@ def main(args):
                 ' please update your usage'
     # TODO check for unused arguments.
 
+    if args.url_cache is not None:
+        Util.URL_CACHE = UrlCache(
+                directory=args.url_cache,
+                max_size=args.url_cache_size,
+                ttl=args.url_cache_ttl,
+                ttls=[(pattern, int(ttl))
+                        for pattern, ttl in args.url_cache_pattern_ttl or []])
+
+    if args.missing_url_cache is not None:
+        args.missing_url_cache = MissingUrlCache(
+                filename=args.missing_url_cache,
+                recent_ttl=args.missing_url_recent_ttl,
+                historical_ttl=args.missing_url_historical_ttl)
+
     # make sure observatory is a tuple
     if isinstance(args.observatory, (str, unicode)):
         args.observatory = (args.observatory,)
@@ -482,6 +503,11 @@ def main(args):
     else:
         _main(args)
 
+    if args.missing_url_cache is not None and \
+            args.missing_url_cache.skipped > 0:
+        print >> sys.stderr, 'Skipped %d missing urls' % \
+                args.missing_url_cache.skipped
+
 
 def _main(args):
     """Actual main method logic, called by main
@@ -672,6 +698,42 @@ def parse_args(args):
             default=86400,
             help='Read url interval in seconds',
             type=int)
+    parser.add_argument('--input-url-workers',
+            default=1,
+            help='Maximum number of urls read at the same time',
+            type=int)
+    parser.add_argument('--url-cache',
+            help='Cache http urls in this directory')
+    parser.add_argument('--url-cache-size',
+            default=1024 ** 3,
+            help='Maximum size of url cache in bytes',
+            type=int)
+    parser.add_argument('--url-cache-ttl',
+            default=0,
+            help='Seconds before cached urls are revalidated',
+            type=int)
+    parser.add_argument('--url-cache-pattern-ttl',
+            action='append',
+            help='Seconds before cached urls matching a pattern,'
+                    ' which may contain "*" wildcards, are revalidated',
+            metavar=('PATTERN', 'SECONDS'),
+            nargs=2)
+    parser.add_argument('--missing-url-cache',
+            help='Remember urls that do not exist in this file,'
+                    ' and skip them until they expire')
+    parser.add_argument('--missing-url-recent-ttl',
+            default=600,
+            help='Seconds before missing urls with data from the last'
+                    ' 7 days are checked again',
+            type=int)
+    parser.add_argument('--missing-url-historical-ttl',
+            default=86400,
+            help='Seconds before other missing urls are checked again',
+            type=int)
+    parser.add_argument('--input-parse-workers',
+            default=1,
+            help='Number of processes used to parse urls',
+            type=int)
 
     input_group.add_argument('--input-edge',
             help='deprecated. \
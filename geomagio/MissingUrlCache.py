@@ -0,0 +1,151 @@
+"""Persistent cache of urls that do not exist."""
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class MissingUrlCache(object):
+    """Cache of urls that do not exist.
+
+    Urls for recent data are more likely to be created soon, so they expire
+    sooner than urls for historical data.
+
+    Parameters
+    ----------
+    filename : str
+        file where missing urls are saved between runs, optional.
+        only kept in memory if unspecified.
+    recent_ttl : int
+        number of seconds before missing urls for recent data are
+        checked again.
+    historical_ttl : int
+        number of seconds before missing urls for historical data are
+        checked again.
+    recent_age : int
+        data ending less than this number of seconds ago is recent.
+
+    Attributes
+    ----------
+    skipped : int
+        number of times ``is_missing`` returned True.
+    """
+    def __init__(self, filename=None, recent_ttl=600, historical_ttl=86400,
+            recent_age=7 * 86400):
+        self.filename = filename
+        self.recent_ttl = recent_ttl
+        self.historical_ttl = historical_ttl
+        self.recent_age = recent_age
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._missing = {}
+        if filename is not None:
+            try:
+                with open(filename, 'r') as f:
+                    self._missing = json.load(f)
+            except (IOError, ValueError):
+                # no saved urls yet
+                pass
+
+    def __getstate__(self):
+        """Pickle without lock, so factories can be sent to worker processes.
+        """
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def add(self, url, endtime):
+        """Record that a url does not exist.
+
+        Expired urls are removed at the same time.
+
+        Parameters
+        ----------
+        url : str
+            url that does not exist.
+        endtime : obspy.core.UTCDateTime
+            end of the data interval in url.
+        """
+        with self._lock:
+            now = time.time()
+            self._missing = dict((key, missing)
+                    for key, missing in self._missing.iteritems()
+                    if not self._is_expired(missing, now))
+            self._missing[url] = {
+                'checked': now,
+                'endtime': endtime.timestamp
+            }
+            self._save()
+
+    def is_missing(self, url):
+        """Check whether a url is known to be missing.
+
+        Parameters
+        ----------
+        url : str
+            url to check.
+
+        Returns
+        -------
+        bool
+            True if url was missing and has not expired,
+            False if url should be read.
+        """
+        with self._lock:
+            missing = self._missing.get(url)
+            if missing is None or self._is_expired(missing, time.time()):
+                return False
+            self.skipped += 1
+            return True
+
+    def remove(self, url):
+        """Record that a url exists.
+
+        Parameters
+        ----------
+        url : str
+            url that exists.
+        """
+        with self._lock:
+            if self._missing.pop(url, None) is not None:
+                self._save()
+
+    def _is_expired(self, missing, now):
+        """Check whether a missing url should be read again.
+
+        Parameters
+        ----------
+        missing : dict
+            cached "checked" and "endtime" timestamps for url.
+        now : float
+            current timestamp.
+
+        Returns
+        -------
+        bool
+            True if time to live has expired.
+        """
+        ttl = self.historical_ttl
+        if now - missing['endtime'] < self.recent_age:
+            ttl = self.recent_ttl
+        return now - missing['checked'] >= ttl
+
+    def _save(self):
+        """Atomically save missing urls to filename, if configured.
+        """
+        if self.filename is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._missing, f)
+            os.rename(temp, self.filename)
+        except Exception:
+            os.remove(temp)
+            raise
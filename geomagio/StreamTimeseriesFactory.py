@@ -1,5 +1,7 @@
 """Stream wrapper for TimeseriesFactory."""
 
+import numpy
+from obspy.core import Stream
 from TimeseriesFactory import TimeseriesFactory
 
 
@@ -26,15 +28,87 @@ class StreamTimeseriesFactory(TimeseriesFactory):
     def get_timeseries(self, starttime, endtime, observatory=None,
             channels=None, type=None, interval=None):
         """Get timeseries using stream as input.
+
+        Seekable streams are parsed incrementally when the wrapped factory
+        implements ``parse_stream``, and rewound so they can be read again.
+        Other streams are read into memory once.
+        Either way, only requested channels are returned, trimmed or padded
+        to the requested window.
         """
-        if self.stream_data is None:
-            # only read stream once
-            self.stream_data = self.stream.read()
-        return self.factory.parse_string(
-                data=self.stream_data,
+        timeseries = None
+        if self.stream_data is None and self._is_seekable():
+            try:
+                timeseries = self._parse_stream(starttime, endtime,
+                        observatory, interval)
+            except NotImplementedError:
+                pass
+        if timeseries is None:
+            if self.stream_data is None:
+                # only read stream once
+                self.stream_data = self.stream.read()
+            timeseries = self.factory.parse_string(
+                    data=self.stream_data,
+                    starttime=starttime,
+                    endtime=endtime,
+                    observatory=observatory)
+        if channels is not None:
+            filtered = Stream()
+            for channel in channels:
+                filtered += timeseries.select(channel=channel)
+            timeseries = filtered
+        timeseries.trim(
                 starttime=starttime,
                 endtime=endtime,
-                observatory=observatory)
+                nearest_sample=False,
+                pad=True,
+                fill_value=numpy.nan)
+        return timeseries
+
+    def _is_seekable(self):
+        """Check whether the stream can be rewound.
+
+        Returns
+        -------
+        bool
+            True if the stream supports tell and seek.
+        """
+        try:
+            self.stream.tell()
+        except (AttributeError, IOError):
+            return False
+        return hasattr(self.stream, 'seek')
+
+    def _parse_stream(self, starttime, endtime, observatory, interval):
+        """Parse the stream incrementally using the wrapped factory.
+
+        Only data within the requested window is kept in memory.
+
+        Returns
+        -------
+        obspy.core.Stream
+            merged data from all parsed blocks.
+
+        Raises
+        ------
+        NotImplementedError
+            if the wrapped factory does not implement parse_stream.
+        """
+        position = self.stream.tell()
+        kwargs = {
+            'starttime': starttime,
+            'endtime': endtime,
+            'observatory': observatory
+        }
+        if interval is not None:
+            kwargs['interval'] = interval
+        timeseries = Stream()
+        try:
+            for stream in self.factory.parse_stream(self.stream, **kwargs):
+                timeseries += stream
+        finally:
+            self.stream.seek(position)
+        timeseries.merge(fill_value=numpy.nan)
+        return timeseries
 
     def put_timeseries(self, timeseries, starttime=None, endtime=None,
             channels=None, type=None, interval=None):
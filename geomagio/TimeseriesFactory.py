@@ -1,8 +1,14 @@
 """Abstract Timeseries Factory Interface."""
+import errno
+import itertools
+import math
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import numpy
 import obspy.core
 import os
 import sys
+from cStringIO import StringIO
 from TimeseriesFactoryException import TimeseriesFactoryException
 import TimeseriesUtility
 import Util
@@ -19,6 +25,16 @@ class TimeseriesFactory(object):
         - implementing `write_file`
         - or, overriding `put_timeseries`
 
+    Add in place update support, for formats with fixed width data lines, by:
+        - implementing `write_file_header` and `write_file_data`
+
+    Add fast inventory support by:
+        - implementing `parse_inventory`
+
+    Add zero copy parsing of local files by:
+        - setting `parse_buffers` to True,
+          when `parse_string` accepts read only buffers as well as strings
+
     Attributes
     ----------
     observatory : str
@@ -39,16 +55,32 @@ class TimeseriesFactory(object):
     urlInterval : int
         Interval in seconds between URLs.
         Intervals begin at the unix epoch (1970-01-01T00:00:00Z)
+    urlWorkers : int
+        Maximum number of URLs read at the same time by `get_timeseries`.
+        default 1, which reads one URL at a time.
+    parseWorkers : int
+        Number of processes used by `get_timeseries` to parse URL contents.
+        default 1, which parses in the calling process.
+    missingUrlCache : MissingUrlCache
+        Cache of URLs that do not exist, optional.
+        `get_timeseries` skips URLs in the cache until they expire.
     """
+    # whether parse_string accepts buffers, see Util.map_file
+    parse_buffers = False
+
     def __init__(self, observatory=None, channels=('H', 'D', 'Z', 'F'),
             type='variation', interval='minute',
-            urlTemplate='', urlInterval=-1):
+            urlTemplate='', urlInterval=-1, urlWorkers=1, parseWorkers=1,
+            missingUrlCache=None):
         self.observatory = observatory
         self.channels = channels
         self.type = type
         self.interval = interval
         self.urlTemplate = urlTemplate
         self.urlInterval = urlInterval
+        self.urlWorkers = urlWorkers
+        self.parseWorkers = parseWorkers
+        self.missingUrlCache = missingUrlCache
 
     def get_timeseries(self, starttime, endtime, observatory=None,
             channels=None, type=None, interval=None):
@@ -98,28 +130,33 @@ class TimeseriesFactory(object):
                 starttime=starttime,
                 endtime=endtime,
                 size=self.urlInterval)
-        for urlInterval in urlIntervals:
-            url = self._get_url(
+        urls = [(self._get_url(
                     observatory=observatory,
                     date=urlInterval['start'],
                     type=type,
                     interval=interval,
-                    channels=channels)
-            try:
-                data = Util.read_url(url)
-            except IOError as e:
-                continue
-            try:
-                timeseries += self.parse_string(data,
-                        observatory=observatory,
-                        type=type,
-                        interval=interval,
-                        channels=channels)
-            except NotImplementedError:
-                raise NotImplementedError('"get_timeseries" not implemented')
-            except Exception as e:
-                print >> sys.stderr, "Error parsing data: " + str(e)
-                print >> sys.stderr, data
+                    channels=channels),
+                urlInterval['end'])
+                for urlInterval in urlIntervals]
+        streams = self._parse_urls(urls,
+                observatory=observatory,
+                type=type,
+                interval=interval,
+                channels=channels,
+                starttime=starttime,
+                endtime=endtime)
+        delta = self._get_interval_delta(interval)
+        if channels is not None and delta is not None:
+            timeseries, remaining = self._assemble_window(streams,
+                    starttime, endtime, delta, channels)
+            if len(remaining) == 0:
+                return timeseries
+            # some traces are not on the sample grid
+            timeseries = TimeseriesUtility.merge_streams(timeseries,
+                    obspy.core.Stream(remaining))
+        else:
+            for stream in streams:
+                timeseries += stream
         if channels is not None:
             filtered = obspy.core.Stream()
             for channel in channels:
@@ -134,6 +171,332 @@ class TimeseriesFactory(object):
                 fill_value=numpy.nan)
         return timeseries
 
+    def _assemble_window(self, streams, starttime, endtime, delta, channels):
+        """Copy parsed traces into one preallocated array per channel.
+
+        Parameters
+        ----------
+        streams : iterable of obspy.core.Stream
+            parsed data.
+        starttime : UTCDateTime
+            start of window.
+        endtime : UTCDateTime
+            end of window.
+        delta : float
+            number of seconds between samples.
+        channels : array_like
+            channels to assemble, other channels are ignored.
+
+        Returns
+        -------
+        tuple
+            (timeseries, remaining), where timeseries is an obspy.core.Stream
+            with one NaN filled trace per channel that has data, in the order
+            of ``channels``, and remaining is a list of traces with a
+            different delta, or samples that are not on the window's sample
+            grid.  When traces overlap, later traces replace earlier ones.
+        """
+        # samples are aligned to the unix epoch
+        first = obspy.core.UTCDateTime(
+                math.ceil(starttime.timestamp / delta) * delta)
+        npts = int(math.floor((endtime - first) / delta)) + 1
+        windows = {}
+        remaining = []
+        for stream in streams:
+            for trace in stream:
+                channel = trace.stats.channel
+                if channel not in channels:
+                    continue
+                offset = (trace.stats.starttime - first) / delta
+                index = int(round(offset))
+                if npts <= 0 or trace.stats.delta != delta or \
+                        abs(offset - index) > 1e-3:
+                    remaining.append(trace)
+                    continue
+                if channel not in windows:
+                    stats = trace.stats.copy()
+                    stats.starttime = first
+                    stats.npts = npts
+                    windows[channel] = obspy.core.Trace(
+                            numpy.full(npts, numpy.nan), stats)
+                start = max(index, 0)
+                end = min(index + len(trace.data), npts)
+                if start < end:
+                    windows[channel].data[start:end] = \
+                            trace.data[start - index:end - index]
+        timeseries = obspy.core.Stream([windows[name]
+                for name in channels if name in windows])
+        return (timeseries, remaining)
+
+    def _read_urls(self, urls):
+        """Read url contents, using up to ``self.urlWorkers`` threads.
+
+        Parameters
+        ----------
+        urls : list<tuple>
+            (url, endtime) of each url to read,
+            where endtime is the end of the data interval in url.
+
+        Returns
+        -------
+        iterable of str
+            contents of each url, in the same order as ``urls``.
+            None for urls that could not be read.
+        """
+        workers = min(self.urlWorkers or 1, len(urls))
+        if workers <= 1:
+            return itertools.imap(self._read_url, urls)
+        return _imap(ThreadPool(workers), self._read_url, urls)
+
+    def _read_url(self, url):
+        """Read url contents, unless url is known to be missing.
+
+        Parameters
+        ----------
+        url : tuple
+            (url, endtime), where endtime is the end of the data interval
+            in url.
+
+        Returns
+        -------
+        str
+            contents of url, or None if url could not be read.
+        """
+        url, endtime = url
+        cache = self.missingUrlCache
+        if cache is not None and cache.is_missing(url):
+            return None
+        try:
+            # buffers cannot be sent to parse worker processes
+            data = Util.read_url(url, buffer=(self.parse_buffers and
+                    (self.parseWorkers or 1) <= 1))
+        except IOError as e:
+            # other errors, like timeouts, may succeed when read again
+            if cache is not None and e.errno == errno.ENOENT:
+                cache.add(url, endtime)
+            return None
+        if cache is not None:
+            cache.remove(url)
+        return data
+
+    def _parse_urls(self, urls, **kwargs):
+        """Read and parse url contents.
+
+        Uses up to ``self.parseWorkers`` processes to parse.
+        Worker processes return parsed traces to this process as pickled
+        numpy arrays, which are copied as raw buffers.
+
+        Parameters
+        ----------
+        urls : list<tuple>
+            (url, endtime) of each url to read, see ``_read_urls``.
+        **kwargs
+            arguments for ``parse_string``.
+
+        Returns
+        -------
+        iterable of obspy.core.Stream
+            parsed contents of each url that could be read,
+            in the same order as ``urls``.
+        """
+        contents = (data for data in self._read_urls(urls)
+                if data is not None)
+        workers = min(self.parseWorkers or 1, len(urls))
+        if workers <= 1:
+            return (self._parse_url_data(data, **kwargs)
+                    for data in contents)
+        # factory is sent to each worker once, not with every url
+        pool = multiprocessing.Pool(workers, _init_parse_worker, (self,))
+        return _imap(pool, _parse_url_data,
+                ((data, kwargs) for data in contents))
+
+    def _parse_url_data(self, data, **kwargs):
+        """Parse url contents.
+
+        Parameters
+        ----------
+        data : str
+            contents of url.
+        **kwargs
+            arguments for ``parse_string``.
+
+        Returns
+        -------
+        obspy.core.Stream
+            parsed data, or an empty stream if an error occurs parsing.
+
+        Raises
+        ------
+        NotImplementedError
+            if factory does not implement ``parse_string``.
+        """
+        try:
+            return self.parse_string(data, **kwargs)
+        except NotImplementedError:
+            raise NotImplementedError('"get_timeseries" not implemented')
+        except Exception as e:
+            print >> sys.stderr, "Error parsing data: " + str(e)
+            print >> sys.stderr, data
+        return obspy.core.Stream()
+
+    def get_inventory(self, starttime, endtime, observatory=None,
+            channels=None, type=None, interval=None):
+        """Get inventory of files with data in a time interval.
+
+        Only reads headers and first/last data lines when the factory
+        implements ``parse_inventory``.
+
+        Parameters
+        ----------
+        starttime : UTCDateTime
+            start of time interval.
+        endtime : UTCDateTime
+            end of time interval.
+        observatory : str
+            observatory code, usually 3 characters, optional.
+            uses default if unspecified.
+        channels : array_like
+            list of channels, optional.
+            uses default if unspecified.
+        type : {'definitive', 'provisional', 'quasi-definitive', 'variation'}
+            data type, optional.
+            uses default if unspecified.
+        interval : {'daily', 'hourly', 'minute', 'monthly', 'second'}
+            data interval, optional.
+            uses default if unspecified.
+
+        Returns
+        -------
+        list<dict>
+            inventory of each existing file, see ``get_url_inventory``.
+        """
+        observatory = observatory or self.observatory
+        channels = channels or self.channels
+        type = type or self.type
+        interval = interval or self.interval
+
+        inventory = []
+        urlIntervals = Util.get_intervals(
+                starttime=starttime,
+                endtime=endtime,
+                size=self.urlInterval)
+        for urlInterval in urlIntervals:
+            url = self._get_url(
+                    observatory=observatory,
+                    date=urlInterval['start'],
+                    type=type,
+                    interval=interval,
+                    channels=channels)
+            try:
+                url_inventory = self.get_url_inventory(url,
+                        observatory=observatory,
+                        type=type,
+                        interval=interval)
+            except Exception as e:
+                print >> sys.stderr, "Error parsing inventory: " + str(e)
+                continue
+            if url_inventory is not None:
+                inventory.append(url_inventory)
+        return inventory
+
+    def get_url_inventory(self, url, **kwargs):
+        """Get inventory of one file.
+
+        Parameters
+        ----------
+        url : str
+            url of file.
+        **kwargs
+            same arguments as ``parse_inventory``.
+
+        Returns
+        -------
+        dict
+            inventory with the keys "url", "station", "channels", "type",
+            "interval", "starttime" and "endtime".
+            None if the url does not exist, or has no data.
+        """
+        try:
+            head, tail = Util.read_url_head_tail(url)
+        except IOError:
+            return None
+        try:
+            inventory = self.parse_inventory(head, tail, **kwargs)
+        except (NotImplementedError, ValueError):
+            inventory = None
+        if inventory is None:
+            # fall back to parsing entire file
+            try:
+                data = Util.read_url(url)
+            except IOError:
+                return None
+            inventory = self._get_stream_inventory(
+                    self.parse_string(data, **kwargs), **kwargs)
+        if inventory is not None:
+            inventory['url'] = url
+        return inventory
+
+    def parse_inventory(self, head, tail, **kwargs):
+        """Parse inventory from the beginning and end of a file.
+
+        Parameters
+        ----------
+        head : str
+            beginning of file, including headers and first data line.
+        tail : str
+            end of file, including last data line.
+        **kwargs
+            same arguments as ``parse_string``.
+
+        Returns
+        -------
+        dict
+            inventory with the keys "station", "channels", "type",
+            "interval", "starttime" and "endtime".
+            None if ``head`` or ``tail`` do not contain enough information.
+        """
+        raise NotImplementedError('"parse_inventory" not implemented')
+
+    def _get_stream_inventory(self, timeseries, type=None, interval=None,
+            **kwargs):
+        """Get inventory from parsed data.
+
+        Parameters
+        ----------
+        timeseries : obspy.core.Stream
+            parsed data.
+        type : str
+            data type of parsed data.
+        interval : str
+            interval to use when it cannot be determined from the data.
+
+        Returns
+        -------
+        dict
+            inventory, see ``parse_inventory``.
+            None if ``timeseries`` is empty.
+        """
+        if len(timeseries) == 0:
+            return None
+        stats = timeseries[0].stats
+        if stats.delta == 1:
+            interval = 'second'
+        elif stats.delta == 60:
+            interval = 'minute'
+        # channels may be split into several traces
+        channels = []
+        for trace in timeseries:
+            if trace.stats.channel not in channels:
+                channels.append(trace.stats.channel)
+        return {
+            'station': stats.station,
+            'channels': channels,
+            'type': type,
+            'interval': interval,
+            'starttime': min(t.stats.starttime for t in timeseries),
+            'endtime': max(t.stats.endtime for t in timeseries)
+        }
+
     def parse_string(self, data, **kwargs):
         """Parse the contents of a string in the format of an IAGA2002 file.
 
@@ -141,6 +504,9 @@ class TimeseriesFactory(object):
         ----------
         data : str
             string containing parsable content.
+        **kwargs
+            factories may use additional arguments, such as ``starttime``
+            and ``endtime``, to only parse data within a time window.
 
         Returns
         -------
@@ -149,6 +515,26 @@ class TimeseriesFactory(object):
         """
         raise NotImplementedError('"parse_string" not implemented')
 
+    def parse_stream(self, fh, **kwargs):
+        """Incrementally parse the contents of a file handle.
+
+        Factories that implement this method can read content that does not
+        fit in memory.
+
+        Parameters
+        ----------
+        fh : file
+            file handle positioned at the start of parsable content.
+        **kwargs
+            same arguments as ``parse_string``.
+
+        Returns
+        -------
+        iterable of obspy.core.Stream
+            parsed data, one stream per block of data.
+        """
+        raise NotImplementedError('"parse_stream" not implemented')
+
     def put_timeseries(self, timeseries, starttime=None, endtime=None,
             channels=None, type=None, interval=None):
         """Store timeseries data.
@@ -207,8 +593,20 @@ class TimeseriesFactory(object):
                     # subtract delta to omit the sample at end: `[start, end)`
                     endtime=(urlInterval['end'] - delta))
             url_file = Util.get_file_from_url(url, createParentDirectory=True)
+            if self.missingUrlCache is not None:
+                # url is about to exist
+                self.missingUrlCache.remove(url)
             # existing data file, merge new data into existing
             if os.path.isfile(url_file):
+                try:
+                    # compressed files cannot be updated in place
+                    if Util.get_compression(url_file) is None and \
+                            self._update_file(url_file, url_data, channels,
+                                type=type, interval=interval):
+                        continue
+                except NotImplementedError:
+                    # factory does not support in place updates
+                    pass
                 try:
                     existing_data = Util.read_file(url_file)
                     existing_data = self.parse_string(existing_data,
@@ -216,29 +614,170 @@ class TimeseriesFactory(object):
                             type=type,
                             interval=interval,
                             channels=channels)
-                    # TODO: make parse_string return the correct location code
-                    for trace in existing_data:
-                        # make location codes match, just in case
-                        new_trace = url_data.select(
-                                network=trace.stats.network,
-                                station=trace.stats.station,
-                                channel=trace.stats.channel)[0]
-                        trace.stats.location = new_trace.stats.location
-                    url_data = TimeseriesUtility.merge_streams(
-                            existing_data, url_data)
+                    url_data = self._merge_existing(existing_data, url_data)
                 except IOError:
                     # no data yet
                     pass
                 except NotImplementedError:
                     # factory only supports output
                     pass
-            with open(url_file, 'wb') as fh:
+            # compressed based on extension
+            with Util.open_file(url_file, 'wb') as fh:
                 try:
                     self.write_file(fh, url_data, channels)
                 except NotImplementedError:
                     raise NotImplementedError(
                             '"put_timeseries" not implemented')
 
+    def _merge_existing(self, existing_data, url_data):
+        """Merge new data into existing data.
+
+        Merged traces span both existing and new data, with NaN where
+        neither has a value.  Used both when files are rewritten and when
+        they are updated in place, so both produce the same data.
+
+        Parameters
+        ----------
+        existing_data : obspy.core.Stream
+            data parsed from an existing file.
+        url_data : obspy.core.Stream
+            new data, which replaces existing data where it is not NaN.
+
+        Returns
+        -------
+        obspy.core.Stream
+            merged data.
+        """
+        if len(existing_data) == 0:
+            return url_data
+        traces = list(existing_data) + list(url_data)
+        starttime = min(trace.stats.starttime for trace in traces)
+        endtime = max(trace.stats.endtime for trace in traces)
+        merged = obspy.core.Stream()
+        for trace in existing_data.copy() + url_data.copy():
+            if merged.select(channel=trace.stats.channel).count() != 0:
+                continue
+            trace.trim(
+                    starttime=starttime,
+                    endtime=endtime,
+                    nearest_sample=False,
+                    pad=True,
+                    fill_value=numpy.nan)
+            merged += trace
+        for new_trace in url_data:
+            trace = merged.select(channel=new_trace.stats.channel)[0]
+            # TODO: make parse_string return the correct location code
+            trace.stats.location = new_trace.stats.location
+            delta = trace.stats.delta
+            index = int(round((new_trace.stats.starttime - starttime) / delta))
+            if index + len(new_trace.data) > len(trace.data) or \
+                    new_trace.stats.delta != delta:
+                # not on the same sample grid
+                return TimeseriesUtility.merge_streams(existing_data,
+                        url_data)
+            data = trace.data[index:index + len(new_trace.data)]
+            new_values = ~numpy.isnan(new_trace.data)
+            data[new_values] = new_trace.data[new_values]
+        return merged
+
+    def _update_file(self, url_file, url_data, channels, type=None,
+            interval=None):
+        """Update an existing file in place.
+
+        Only data lines between the first and last new sample are read,
+        merged using ``_merge_existing``, and rewritten, and lines after
+        the end of the file are appended.  This requires the existing file
+        to have the same headers as new data, to start at or before new
+        data, and every existing and new data line to have the same width
+        and line ending.
+
+        Parameters
+        ----------
+        url_file : str
+            path to existing file.
+        url_data : obspy.core.Stream
+            new data to store in file.
+        channels : array_like
+            list of channels to store.
+        type : str
+            data type.
+        interval : str
+            data interval.
+
+        Returns
+        -------
+        bool
+            True if file was updated,
+            False if file must be rewritten instead.
+
+        Raises
+        ------
+        NotImplementedError
+            if factory does not implement
+            ``write_file_header`` and ``write_file_data``.
+        """
+        out = StringIO()
+        self.write_file_header(out, url_data, channels)
+        header = out.getvalue()
+        parse_args = {
+            'observatory': url_data[0].stats.station,
+            'type': type,
+            'interval': interval,
+            'channels': channels
+        }
+        with open(url_file, 'r+b') as fh:
+            if fh.read(len(header)) != header:
+                # headers changed
+                return False
+            line = fh.readline()
+            line_format = _get_line_format(line)
+            if line_format is None:
+                return False
+            width = line_format[0]
+            fh.seek(0, os.SEEK_END)
+            count, remainder = divmod(fh.tell() - len(header), width)
+            if remainder != 0:
+                return False
+            existing_data = self.parse_string(header + line, **parse_args)
+            if len(existing_data) == 0:
+                return False
+            delta = url_data[0].stats.delta
+            file_start = existing_data[0].stats.starttime
+            starttime = min(trace.stats.starttime for trace in url_data)
+            endtime = max(trace.stats.endtime for trace in url_data)
+            start = (starttime - file_start) / delta
+            if start < 0 or start != int(start):
+                # new data before, or not aligned with, existing data
+                return False
+            start = int(start)
+            end = int(round((endtime - file_start) / delta)) + 1
+            if start < count:
+                # merge with existing lines that overlap new data
+                fh.seek(len(header) + start * width)
+                existing = fh.read((min(end, count) - start) * width)
+                if _get_line_format(existing) != line_format:
+                    return False
+                existing_data = self.parse_string(header + existing,
+                        **parse_args)
+                url_data = self._merge_existing(existing_data, url_data)
+            else:
+                # fill gap after existing lines
+                start = count
+                url_data = url_data.copy().trim(
+                        starttime=file_start + start * delta,
+                        nearest_sample=False,
+                        pad=True,
+                        fill_value=numpy.nan)
+            out = StringIO()
+            self.write_file_data(out, url_data, channels)
+            data = out.getvalue()
+            if _get_line_format(data) != line_format or \
+                    len(data) != (end - start) * width:
+                return False
+            fh.seek(len(header) + start * width)
+            fh.write(data)
+        return True
+
     def write_file(self, fh, timeseries, channels):
         """Write timeseries data to the given file object.
 
@@ -253,6 +792,34 @@ class TimeseriesFactory(object):
         """
         raise NotImplementedError('"write_file" not implemented')
 
+    def write_file_header(self, fh, timeseries, channels):
+        """Write file headers to the given file object.
+
+        Parameters
+        ----------
+        fh : writable
+            file handle where headers are written.
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : list
+            list of channels to store.
+        """
+        raise NotImplementedError('"write_file_header" not implemented')
+
+    def write_file_data(self, fh, timeseries, channels):
+        """Write data lines, which all have the same width.
+
+        Parameters
+        ----------
+        fh : writable
+            file handle where data lines are written.
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : list
+            list of channels to store.
+        """
+        raise NotImplementedError('"write_file_data" not implemented')
+
     def _get_file_from_url(self, url):
         """Get a file for writing.
 
@@ -369,6 +936,25 @@ class TimeseriesFactory(object):
                     'Unexpected interval "%s"' % interval)
         return interval_abbr
 
+    def _get_interval_delta(self, interval):
+        """Get the number of seconds between samples for a data interval.
+
+        Parameters
+        ----------
+        interval : {'daily', 'hourly', 'minute', 'monthly', 'second'}
+
+        Returns
+        -------
+        number of seconds between samples,
+        or None if ``interval`` does not have a fixed delta.
+        """
+        return {
+            'daily': 86400,
+            'hourly': 3600,
+            'minute': 60,
+            'second': 1
+        }.get(interval)
+
     def _get_interval_name(self, interval):
         """Get name for a data interval.
 
@@ -456,3 +1042,93 @@ class TimeseriesFactory(object):
             raise TimeseriesFactoryException(
                     'Unsupported type "%s"' % type)
         return type_name
+
+
+# factory used by parse worker processes, see _init_parse_worker
+_parse_factory = None
+
+
+def _imap(pool, function, items):
+    """Apply a function to items in a pool.
+
+    Parameters
+    ----------
+    pool : multiprocessing.pool.Pool
+        pool of processes or threads, which is terminated when done.
+    function : callable
+        function to apply to each item.
+    items : iterable
+        items to process.
+
+    Yields
+    ------
+    results of ``function``, in the same order as ``items``,
+    as soon as each result and those before it are available.
+    """
+    try:
+        for result in pool.imap(function, items):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _init_parse_worker(factory):
+    """Set the factory used by ``_parse_url_data`` in a worker process.
+
+    Parameters
+    ----------
+    factory : TimeseriesFactory
+        factory that parses url contents.
+    """
+    global _parse_factory
+    _parse_factory = factory
+
+
+def _parse_url_data(args):
+    """Parse url contents in a worker process.
+
+    Parameters
+    ----------
+    args : tuple
+        (data, kwargs), see ``TimeseriesFactory._parse_url_data``.
+
+    Returns
+    -------
+    obspy.core.Stream
+        parsed data.
+    """
+    data, kwargs = args
+    return _parse_factory._parse_url_data(data, **kwargs)
+
+
+def _get_line_format(data):
+    """Get the width and line ending of lines that are all the same.
+
+    Parameters
+    ----------
+    data : str
+        content containing lines.
+
+    Returns
+    -------
+    tuple
+        (width, line ending), where width includes the line ending.
+        None if data is empty, or lines do not all have the same width and
+        line ending.
+    """
+    end = data.find('\n')
+    if end == -1:
+        return None
+    width = end + 1
+    eol = data[end - 1:end + 1] if data[end - 1:end] == '\r' else '\n'
+    count, remainder = divmod(len(data), width)
+    if remainder != 0 or data.count('\n') != count or \
+            data.count('\r') != (count if eol == '\r\n' else 0):
+        return None
+    rows = numpy.frombuffer(data, dtype=numpy.uint8).reshape(count, width)
+    if not numpy.all(rows[:, -1] == ord('\n')):
+        return None
+    if eol == '\r\n' and not numpy.all(rows[:, -2] == ord('\r')):
+        return None
+    return (width, eol)
@@ -1,6 +1,7 @@
 """Timeseries Utilities"""
 import numpy
 import obspy.core
+import ChannelConverter
 
 
 def get_stream_gaps(stream):
@@ -132,6 +133,84 @@ def get_channels(stream):
     return [ch for ch in channels]
 
 
+def get_output_values(traces, start=0, end=None, out=None,
+        convert_d=False):
+    """Get trace values for output.
+
+    Values are copied into ``out``, so traces are never modified.
+
+    Parameters
+    ----------
+    traces : sequence of obspy.core.Trace
+        traces to output, all with the same number of samples.
+    start : int
+        index of first sample.
+    end : int
+        index after last sample, optional.
+        defaults to the number of samples in the first trace.
+    out : numpy.ndarray
+        scratch array from a previous call, optional.
+        reused when it has one row per trace and at least end - start
+        columns, otherwise a new array is allocated.
+    convert_d : bool
+        whether to convert declination (channel D) from radians to minutes.
+
+    Returns
+    -------
+    numpy.ndarray
+        2 dimensional float array with one row per trace,
+        and one column per sample.
+    """
+    if end is None:
+        end = len(traces[0].data)
+    count = end - start
+    if out is None or out.shape[0] != len(traces) or out.shape[1] < count:
+        out = numpy.empty((len(traces), count))
+    else:
+        out = out[:, :count]
+    for i, trace in enumerate(traces):
+        row = out[i]
+        row[:] = trace.data[start:end]
+        if convert_d and trace.stats.channel == 'D':
+            numpy.multiply(row, ChannelConverter.R2M, row)
+    return out
+
+
+def get_sample_times(trace, start=0, end=None):
+    """Get times of samples in a trace.
+
+    Times match ``datetime.utcfromtimestamp(starttime + i * delta)``,
+    including its rounding to the nearest microsecond.
+
+    Parameters
+    ----------
+    trace : obspy.core.Trace
+        trace with starttime and delta.
+    start : int
+        index of first sample.
+    end : int
+        index after last sample, optional.
+        defaults to the number of samples in trace.
+
+    Returns
+    -------
+    numpy.ndarray
+        array of numpy.datetime64 with microsecond resolution.
+    """
+    if end is None:
+        end = len(trace.data)
+    timestamps = float(trace.stats.starttime) + \
+            numpy.arange(start, end) * trace.stats.delta
+    seconds = numpy.trunc(timestamps)
+    # round half away from zero
+    microseconds = (timestamps - seconds) * 1e6
+    microseconds = numpy.where(microseconds >= 0,
+            numpy.floor(microseconds + 0.5),
+            numpy.ceil(microseconds - 0.5))
+    return (seconds * 1000000 + microseconds).astype(numpy.int64).astype(
+            'datetime64[us]')
+
+
 def mask_stream(stream):
     """Convert stream traces to masked arrays.
 
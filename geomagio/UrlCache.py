@@ -0,0 +1,270 @@
+"""Persistent cache of url contents."""
+import fnmatch
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class UrlCache(object):
+    """On disk cache of url contents.
+
+    Cached contents are returned without a request until their time to live
+    expires.  Expired contents are revalidated using the ETag and
+    Last-Modified headers from the response that was cached.
+
+    Parameters
+    ----------
+    directory : str
+        directory where cached contents are stored.
+    max_size : int
+        maximum number of bytes of cached contents.
+        least recently used contents are removed when exceeded.
+    ttl : int
+        default number of seconds before cached contents are revalidated.
+        0 always revalidates, None never revalidates.
+    ttls : list<tuple>
+        (pattern, ttl) pairs, where pattern is a url pattern that may
+        contain shell style wildcards, for example a url template with its
+        replacement patterns replaced by '*'.
+        the first matching pattern is used instead of ``ttl``.
+    """
+    def __init__(self, directory, max_size=1024 ** 3, ttl=0, ttls=None):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ttls = ttls or []
+        self._lock = threading.Lock()
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    def get(self, url):
+        """Get cached metadata for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of cached contents.
+
+        Returns
+        -------
+        dict
+            metadata with the keys "url", "etag", "last_modified",
+            "size" and "validated".
+            None if url is not cached.
+        """
+        try:
+            with open(self._get_path(url) + '.json', 'r') as f:
+                metadata = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if metadata.get('url') != url:
+            return None
+        return metadata
+
+    def get_content(self, url):
+        """Get cached contents for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of cached contents.
+
+        Returns
+        -------
+        str
+            cached contents.
+
+        Raises
+        ------
+        IOError
+            if contents are not cached.
+        """
+        path = self._get_path(url)
+        with open(path, 'rb') as f:
+            content = f.read()
+        # modification time of metadata tracks least recent use
+        try:
+            os.utime(path + '.json', None)
+        except OSError:
+            pass
+        return content
+
+    def get_request_headers(self, metadata):
+        """Get headers for a conditional request.
+
+        Parameters
+        ----------
+        metadata : dict
+            cached metadata, from ``get``.
+
+        Returns
+        -------
+        list<str>
+            request headers.
+        """
+        headers = []
+        if metadata.get('etag'):
+            headers.append('If-None-Match: ' + metadata['etag'])
+        if metadata.get('last_modified'):
+            headers.append('If-Modified-Since: ' + metadata['last_modified'])
+        return headers
+
+    def get_ttl(self, url):
+        """Get the time to live for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of contents.
+
+        Returns
+        -------
+        int
+            number of seconds before cached contents are revalidated,
+            or None to never revalidate.
+        """
+        for pattern, ttl in self.ttls:
+            if fnmatch.fnmatchcase(url, pattern):
+                return ttl
+        return self.ttl
+
+    def is_fresh(self, metadata):
+        """Check whether cached contents can be used without revalidating.
+
+        Parameters
+        ----------
+        metadata : dict
+            cached metadata, from ``get``.
+
+        Returns
+        -------
+        bool
+            True if time to live has not expired.
+        """
+        ttl = self.get_ttl(metadata['url'])
+        if ttl is None:
+            return True
+        return time.time() - metadata['validated'] < ttl
+
+    def put(self, url, content, headers):
+        """Cache contents for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of contents.
+        content : str
+            contents returned by url.
+        headers : dict
+            response headers, with lower case names.
+        """
+        if len(content) > self.max_size:
+            return
+        path = self._get_path(url)
+        self._write(path, content)
+        self._write_metadata(url, {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'size': len(content),
+            'validated': time.time()
+        })
+        self._evict()
+
+    def revalidated(self, url, metadata, headers):
+        """Record that cached contents were revalidated.
+
+        Parameters
+        ----------
+        url : str
+            url of contents.
+        metadata : dict
+            cached metadata, from ``get``.
+        headers : dict
+            "304 Not Modified" response headers, with lower case names.
+        """
+        metadata = dict(metadata)
+        if headers.get('etag'):
+            metadata['etag'] = headers['etag']
+        if headers.get('last-modified'):
+            metadata['last_modified'] = headers['last-modified']
+        metadata['validated'] = time.time()
+        self._write_metadata(url, metadata)
+
+    def _evict(self):
+        """Remove least recently used contents until within max_size.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.directory, name[:-len('.json')])
+                try:
+                    size = os.path.getsize(path)
+                    used = os.path.getmtime(path + '.json')
+                except OSError:
+                    continue
+                entries.append((used, size, path))
+                total += size
+            entries.sort()
+            for used, size, path in entries:
+                if total <= self.max_size:
+                    break
+                for remove in (path + '.json', path):
+                    try:
+                        os.remove(remove)
+                    except OSError:
+                        pass
+                total -= size
+
+    def _get_path(self, url):
+        """Get the path where contents for a url are cached.
+
+        Parameters
+        ----------
+        url : str
+            url of contents.
+
+        Returns
+        -------
+        str
+            path to cached contents,
+            metadata is stored in the same path with a ".json" suffix.
+        """
+        return os.path.join(self.directory, hashlib.sha1(url).hexdigest())
+
+    def _write(self, path, content):
+        """Atomically write a file.
+
+        Parameters
+        ----------
+        path : str
+            path to file.
+        content : str
+            file contents.
+        """
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.rename(temp, path)
+        except Exception:
+            os.remove(temp)
+            raise
+
+    def _write_metadata(self, url, metadata):
+        """Atomically write metadata for a url.
+
+        Parameters
+        ----------
+        url : str
+            url of contents.
+        metadata : dict
+            metadata to write.
+        """
+        self._write(self._get_path(url) + '.json', json.dumps(metadata))
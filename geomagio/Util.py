@@ -1,8 +1,39 @@
+import bz2
+import errno
+import gzip
+import mmap
 import pycurl
 import numpy
 import os
+import threading
+import urlparse
+import zlib
 from obspy.core import Stats, Trace
 from StringIO import StringIO
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        # xz compression is optional
+        lzma = None
+
+
+# compression formats, by file extension
+COMPRESSION_EXTENSIONS = {
+    '.bz2': 'bz2',
+    '.gz': 'gzip',
+    '.xz': 'xz'
+}
+# first bytes of content in each compression format
+COMPRESSION_MAGIC = {
+    'bz2': 'BZh',
+    'gzip': '\x1f\x8b',
+    'xz': '\xfd7zXZ\x00'
+}
+# number of bytes read at a time when decompressing files
+READ_SIZE = 1024 * 1024
 
 
 class ObjectView(object):
@@ -24,6 +55,242 @@ class ObjectView(object):
         return str(self.__dict__)
 
 
+class CurlPool(object):
+    """Pool of reusable pycurl handles.
+
+    Each idle handle keeps its connections open, so later requests to the same
+    host skip DNS lookup, and TCP and TLS handshakes.  DNS and TLS sessions
+    are also shared between handles.  Pools are safe to use from multiple
+    threads.
+
+    Parameters
+    ----------
+    size : int
+        maximum number of idle handles kept for reuse.
+    max_connections : int
+        maximum number of open connections kept by each handle.
+    keepalive : bool
+        whether to send TCP keep-alive probes on idle connections.
+    """
+    def __init__(self, size=4, max_connections=5, keepalive=True):
+        self.size = size
+        self.max_connections = max_connections
+        self.keepalive = keepalive
+        self._handles = []
+        self._lock = threading.Lock()
+        self._share = pycurl.CurlShare()
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self._share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+
+    def get(self):
+        """Get a handle, reusing an idle handle when possible.
+
+        Returns
+        -------
+        pycurl.Curl
+            handle, which should be returned to the pool using ``put``.
+            reused handles keep options from earlier requests, so callers
+            should set every request specific option.
+
+        Raises
+        ------
+        pycurl.error
+            if a new handle cannot be configured.
+        """
+        with self._lock:
+            if self._handles:
+                # keeps open connections
+                return self._handles.pop()
+        curl = pycurl.Curl()
+        try:
+            # a handle can only be added to a share once
+            curl.setopt(pycurl.SHARE, self._share)
+            curl.setopt(pycurl.MAXCONNECTS, self.max_connections)
+            if self.keepalive and hasattr(pycurl, 'TCP_KEEPALIVE'):
+                curl.setopt(pycurl.TCP_KEEPALIVE, 1)
+        except pycurl.error:
+            curl.close()
+            raise
+        return curl
+
+    def put(self, curl):
+        """Return a handle to the pool.
+
+        Parameters
+        ----------
+        curl : pycurl.Curl
+            handle from ``get``, closed if the pool is full.
+        """
+        with self._lock:
+            if len(self._handles) < self.size:
+                self._handles.append(curl)
+                return
+        curl.close()
+
+    def close(self):
+        """Close all idle handles, and their connections.
+        """
+        with self._lock:
+            handles = self._handles
+            self._handles = []
+        for curl in handles:
+            curl.close()
+
+
+# handles shared by every read_url call in this process
+URL_POOL = CurlPool()
+# cache used by every read_url call in this process, disabled when None
+URL_CACHE = None
+
+
+class Decompressor(object):
+    """Incrementally decompress content.
+
+    Content that does not start with the expected magic bytes, for example
+    because it was already decoded during transfer, is returned unchanged.
+    Concatenated streams, like multi-member gzip files, are decompressed
+    one after another.
+
+    Parameters
+    ----------
+    compression : {'bz2', 'gzip', 'xz'}
+        compression format.
+
+    Raises
+    ------
+    IOError
+        if compression format is not supported.
+    """
+    def __init__(self, compression):
+        if compression == 'xz' and lzma is None:
+            raise IOError('xz compression requires the lzma module')
+        self._compression = compression
+        self._magic = COMPRESSION_MAGIC[compression]
+        self._decompressor = self._create_decompressor()
+        self._buffer = ''
+        self._compressed = None
+
+    def _create_decompressor(self):
+        """Create a decompressor for one compressed stream.
+
+        Returns
+        -------
+        object
+            decompressor with ``decompress`` method and ``unused_data``
+            attribute.
+        """
+        if self._compression == 'bz2':
+            return bz2.BZ2Decompressor()
+        if self._compression == 'gzip':
+            # 16 = expect gzip header
+            return zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return lzma.LZMADecompressor()
+
+    def decompress(self, data):
+        """Decompress a chunk of content.
+
+        Parameters
+        ----------
+        data : str
+            next chunk of compressed content.
+
+        Returns
+        -------
+        str
+            decompressed content available so far.
+        """
+        if self._compressed is None:
+            self._buffer += data
+            if len(self._buffer) < len(self._magic):
+                return ''
+            self._compressed = self._buffer.startswith(self._magic)
+            data = self._buffer
+            self._buffer = ''
+        if not self._compressed:
+            return data
+        output = []
+        try:
+            while data:
+                try:
+                    output.append(self._decompressor.decompress(data))
+                except EOFError:
+                    # previous stream ended at the end of previous data
+                    self._decompressor = self._create_decompressor()
+                    output.append(self._decompressor.decompress(data))
+                data = self._decompressor.unused_data
+                if data.strip('\x00') == '':
+                    # ignore padding after last stream
+                    break
+                # start of next stream
+                self._decompressor = self._create_decompressor()
+        except (EOFError, zlib.error, ValueError) as e:
+            raise IOError(e.args)
+        return ''.join(output)
+
+    def flush(self):
+        """Get any remaining decompressed content.
+
+        Returns
+        -------
+        str
+            remaining content.
+        """
+        data = self._buffer
+        self._buffer = ''
+        if self._compressed and hasattr(self._decompressor, 'flush'):
+            data += self._decompressor.flush()
+        return data
+
+
+def get_compression(path):
+    """Get the compression format of a file or url, from its extension.
+
+    Parameters
+    ----------
+    path : str
+        path or url.
+
+    Returns
+    -------
+    str
+        'bz2', 'gzip' or 'xz', or None if not compressed.
+    """
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def open_file(filepath, mode='rb'):
+    """Open a file, compressed based on its extension.
+
+    Parameters
+    ----------
+    filepath : str
+        path to a file.
+    mode : str
+        mode used to open file.
+
+    Returns
+    -------
+    file
+        file object, which decompresses when reading
+        and compresses when writing.
+
+    Raises
+    ------
+    IOError
+        if file cannot be opened.
+    """
+    compression = get_compression(filepath)
+    if compression == 'bz2':
+        return bz2.BZ2File(filepath, mode)
+    if compression == 'gzip':
+        return gzip.GzipFile(filepath, mode, compresslevel=6)
+    if compression == 'xz':
+        if lzma is None:
+            raise IOError('xz compression requires the lzma module')
+        return lzma.LZMAFile(filepath, mode)
+    return open(filepath, mode)
+
+
 def get_file_from_url(url, createParentDirectory=False):
     """Get a file for writing.
 
@@ -57,6 +324,75 @@ def get_file_from_url(url, createParentDirectory=False):
     return filename
 
 
+def get_fixed_width_column(rows, start, end, dtype=numpy.float64):
+    """Decode one column of fixed width rows.
+
+    Parameters
+    ----------
+    rows : numpy.ndarray
+        2 dimensional array of bytes, see get_fixed_width_rows.
+    start : int
+        index of first character in column.
+    end : int
+        index after last character in column.
+    dtype : numpy.dtype
+        type of returned values.
+
+    Returns
+    -------
+    numpy.ndarray
+        array of decoded column values, one per row.
+
+    Raises
+    ------
+    ValueError
+        if any value in the column cannot be converted to dtype.
+    """
+    column = numpy.ascontiguousarray(rows[:, start:end])
+    return column.view('S%d' % (end - start)).ravel().astype(dtype)
+
+
+def get_fixed_width_rows(data, offset=0):
+    """Get fixed width lines as a 2 dimensional array of bytes.
+
+    The returned array shares memory with ``data`` when possible.
+
+    Parameters
+    ----------
+    data : str or buffer
+        content containing lines that all have the same width.
+    offset : int
+        position of the first line in ``data``.
+
+    Returns
+    -------
+    numpy.ndarray
+        array of uint8 with shape (lines, width), where width includes the
+        line ending.
+        None if lines do not all have the same width.
+    """
+    end = data.find('\n', offset)
+    if end == -1:
+        return None
+    width = end + 1 - offset
+    count, remainder = divmod(len(data) - offset, width)
+    if remainder != 0:
+        # last line may be missing its line ending
+        eol = '\r\n' if data[end - 1:end] == '\r' else '\n'
+        data = data[offset:].rstrip('\r\n') + eol
+        offset = 0
+        count, remainder = divmod(len(data), width)
+        if remainder != 0:
+            return None
+    if count == 0:
+        return numpy.zeros((0, width), dtype=numpy.uint8)
+    rows = numpy.frombuffer(data, dtype=numpy.uint8,
+            count=count * width, offset=offset).reshape(count, width)
+    if not numpy.all(rows[:, -1] == ord('\n')):
+        return None
+    return rows
+
+
 def get_intervals(starttime, endtime, size=86400, align=True, trim=False):
     """Divide an interval into smaller intervals.
 
@@ -107,6 +443,8 @@ def get_intervals(starttime, endtime, size=86400, align=True, trim=False):
 def read_file(filepath):
     """Open and read file contents.
 
+    Files with a ".bz2", ".gz" or ".xz" extension are decompressed.
+
     Parameters
     ----------
     filepath : str
@@ -123,55 +461,311 @@ def read_file(filepath):
         if file does not exist
     """
     file_data = None
-    with open(filepath, 'r') as f:
-        file_data = f.read()
+    compression = get_compression(filepath)
+    with open(filepath, 'rb' if compression else 'r') as f:
+        if compression is None:
+            file_data = f.read()
+        else:
+            decompressor = Decompressor(compression)
+            chunks = []
+            for chunk in iter(lambda: f.read(READ_SIZE), ''):
+                chunks.append(decompressor.decompress(chunk))
+            chunks.append(decompressor.flush())
+            file_data = ''.join(chunks)
     return file_data
 
 
-def read_url(url, connect_timeout=15, max_redirects=5, timeout=300):
+def map_file(filepath):
+    """Map file contents into memory, without reading them.
+
+    Compressed and empty files cannot be mapped, and are read instead.
+
+    Parameters
+    ----------
+    filepath : str
+        path to a file
+
+    Returns
+    -------
+    mmap.mmap or str
+        read only buffer of file contents, which supports ``find``, ``len``
+        and slicing like a str.  The file is unmapped when the buffer, and
+        any numpy arrays created from it, are garbage collected.
+
+    Raises
+    ------
+    IOError
+        if file does not exist
+    """
+    if get_compression(filepath) is not None:
+        return read_file(filepath)
+    with open(filepath, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return ''
+        except (EnvironmentError, mmap.error):
+            # file system does not support mapping
+            return f.read()
+
+
+def read_file_head_tail(filepath, size=8192):
+    """Read the beginning and end of a file.
+
+    Parameters
+    ----------
+    filepath : str
+        path to a file
+    size : int
+        maximum number of bytes to read from each end of the file.
+
+    Returns
+    -------
+    tuple
+        (head, tail) strings, which overlap when the file is smaller than
+        ``2 * size``.
+
+    Raises
+    ------
+    IOError
+        if file does not exist
+    """
+    if get_compression(filepath) is not None:
+        # compressed content cannot be read from the end
+        content = read_file(filepath)
+        return (content[:size], content[-size:])
+    with open(filepath, 'r') as f:
+        head = f.read(size)
+        if len(head) < size:
+            # entire file
+            return (head, head)
+        f.seek(0, os.SEEK_END)
+        f.seek(max(f.tell() - size, 0))
+        tail = f.read()
+    return (head, tail)
+
+
+def read_url_head_tail(url, size=8192):
+    """Read the beginning and end of url contents.
+
+    File urls only read the requested bytes,
+    other urls read the entire content.
+
+    Parameters
+    ----------
+    url : str
+        A urllib2 compatible url, such as http:// or file://.
+    size : int
+        maximum number of bytes to return from each end of the content.
+
+    Returns
+    -------
+    tuple
+        (head, tail) strings, which overlap when the content is smaller than
+        ``2 * size``.
+
+    Raises
+    ------
+    IOError
+        if any occurs
+    """
+    try:
+        # short circuit file urls
+        filepath = get_file_from_url(url)
+        return read_file_head_tail(filepath, size)
+    except IOError as e:
+        raise e
+    except Exception:
+        pass
+    content = read_url(url)
+    return (content[:size], content[-size:])
+
+
+def read_url(url, connect_timeout=15, max_redirects=5, timeout=300,
+        pool=None, cache=None, buffer=False):
     """Open and read url contents.
 
     Parameters
     ----------
     url : str
         A urllib2 compatible url, such as http:// or file://.
+    connect_timeout : int
+        maximum number of seconds to wait for a connection.
+    max_redirects : int
+        maximum number of redirects to follow.
+    timeout : int
+        maximum number of seconds for the entire request.
+    pool : CurlPool
+        pool of reusable handles, optional.
+        uses URL_POOL if unspecified.
+    cache : UrlCache
+        cache of url contents, optional.
+        uses URL_CACHE if unspecified, file urls are never cached.
+    buffer : bool
+        map file urls into memory, see ``map_file``, instead of reading
+        them into a str.
 
     Returns
     -------
     str
         contents returned by url.
+        urls with a ".bz2", ".gz" or ".xz" extension, and content with a
+        Content-Encoding header, are decompressed.
 
     Raises
     ------
     IOError
-        if any occurs
+        if any occurs, including when url is not found.
     """
     try:
         # short circuit file urls
         filepath = get_file_from_url(url)
+        if buffer:
+            return map_file(filepath)
         return read_file(filepath)
     except IOError as e:
         raise e
     except Exception:
         pass
-    content = None
+    cache = cache or URL_CACHE
+    pool = pool or URL_POOL
+    metadata = None
+    request_headers = []
+    if cache is not None:
+        metadata = cache.get(url)
+        if metadata is not None:
+            try:
+                if cache.is_fresh(metadata):
+                    return cache.get_content(url)
+                request_headers = cache.get_request_headers(metadata)
+            except IOError:
+                # contents were evicted
+                metadata = None
+                request_headers = []
+    compression = get_compression(urlparse.urlparse(url).path)
+    code, headers, content = _perform_request(url, request_headers, pool,
+            connect_timeout, max_redirects, timeout, compression)
+    _check_response_code(url, code)
+    if cache is None:
+        return content
+    if code == 304 and metadata is not None:
+        try:
+            content = cache.get_content(url)
+            cache.revalidated(url, metadata, headers)
+            return content
+        except IOError:
+            # contents were evicted, request again without conditions
+            code, headers, content = _perform_request(url, [], pool,
+                    connect_timeout, max_redirects, timeout, compression)
+            _check_response_code(url, code)
+    if code == 200:
+        cache.put(url, content, headers)
+    return content
+
+
+def _check_response_code(url, code):
+    """Check that a response is not an error.
+
+    Parameters
+    ----------
+    url : str
+        requested url.
+    code : int
+        response code.
+
+    Raises
+    ------
+    IOError
+        if code is 400 or greater,
+        with errno ENOENT if code is 404.
+    """
+    if code == 404:
+        raise IOError(errno.ENOENT, 'url not found "%s"' % url)
+    if code >= 400:
+        raise IOError('error %d reading url "%s"' % (code, url))
+
+
+def _perform_request(url, headers, pool, connect_timeout, max_redirects,
+        timeout, compression=None):
+    """Perform an HTTP request using a pooled handle.
+
+    Parameters
+    ----------
+    url : str
+        url to request.
+    headers : list<str>
+        request headers.
+    pool : CurlPool
+        pool of reusable handles.
+    connect_timeout : int
+        maximum number of seconds to wait for a connection.
+    max_redirects : int
+        maximum number of redirects to follow.
+    timeout : int
+        maximum number of seconds for the entire request.
+    compression : {'bz2', 'gzip', 'xz'}
+        decompress content as it is received, optional.
+        content with a Content-Encoding header is always decompressed.
+
+    Returns
+    -------
+    tuple
+        (code, headers, content), where headers is a dict of the final
+        response headers with lower case names.
+
+    Raises
+    ------
+    IOError
+        if any occurs
+    """
     out = StringIO()
-    curl = pycurl.Curl()
+    write = out.write
+    decompressor = None
+    if compression is not None:
+        decompressor = Decompressor(compression)
+
+        def write(data):
+            out.write(decompressor.decompress(data))
+    response_headers = {}
+
+    def parse_header(line):
+        if line.startswith('HTTP/'):
+            # new response, after a redirect
+            response_headers.clear()
+        elif ':' in line:
+            name, value = line.split(':', 1)
+            response_headers[name.strip().lower()] = value.strip()
+
+    curl = None
+    reuse = False
     try:
+        curl = pool.get()
         curl.setopt(pycurl.FOLLOWLOCATION, 1)
         curl.setopt(pycurl.MAXREDIRS, max_redirects)
         curl.setopt(pycurl.CONNECTTIMEOUT, connect_timeout)
         curl.setopt(pycurl.TIMEOUT, timeout)
         curl.setopt(pycurl.NOSIGNAL, 1)
         curl.setopt(pycurl.URL, url)
-        curl.setopt(pycurl.WRITEFUNCTION, out.write)
+        curl.setopt(pycurl.HTTPHEADER, headers)
+        curl.setopt(pycurl.HEADERFUNCTION, parse_header)
+        # accept and decode any supported Content-Encoding
+        curl.setopt(pycurl.ENCODING, '')
+        curl.setopt(pycurl.WRITEFUNCTION, write)
         curl.perform()
-        content = out.getvalue()
+        code = curl.getinfo(pycurl.RESPONSE_CODE)
+        if decompressor is not None:
+            out.write(decompressor.flush())
+        reuse = True
     except pycurl.error as e:
         raise IOError(e.args)
     finally:
-        curl.close()
-    return content
+        if reuse:
+            pool.put(curl)
+        elif curl is not None:
+            # connection may be in a bad state
+            curl.close()
+    return (code, response_headers, out.getvalue())
 
 
 def create_empty_trace(trace, channel):
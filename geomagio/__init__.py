@@ -5,23 +5,27 @@ import ChannelConverter
 import StreamConverter
 
 from Controller import Controller
+from MissingUrlCache import MissingUrlCache
 from ObservatoryMetadata import ObservatoryMetadata
 from PlotTimeseriesFactory import PlotTimeseriesFactory
 from TimeseriesFactory import TimeseriesFactory
 from TimeseriesFactoryException import TimeseriesFactoryException
 import TimeseriesUtility
+from UrlCache import UrlCache
 import Util
 
 __all__ = [
     'ChannelConverter',
     'Controller',
     'DeltaFAlgorithm',
+    'MissingUrlCache',
     'ObservatoryMetadata',
     'PlotTimeseriesFactory',
     'StreamConverter',
     'TimeseriesFactory',
     'TimeseriesFactoryException',
     'TimeseriesUtility',
+    'UrlCache',
     'Util',
     'Url',
     'XYZAlgorithm'
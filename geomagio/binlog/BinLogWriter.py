@@ -1,20 +1,13 @@
 
 import numpy
 from cStringIO import StringIO
-from datetime import datetime
 from .. import ChannelConverter, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
 
 
-# For binlog, need to track previous volt/bin values.
-h_prev = [99.999999, 999]
-e_prev = [99.999999, 999]
-z_prev = [99.999999, 999]
-# Use seperate HEZ buffers to group binlog output by component.
-Hbuf = []
-Ebuf = []
-Zbuf = []
+# volt and bin values output for missing data.
+VOLT_DEAD = 99.999999
+BIN_DEAD = 999
 
 
 class BinLogWriter(object):
@@ -45,16 +38,16 @@ class BinLogWriter(object):
 
         out.write(self._format_header(stats))
 
-        self._format_data(timeseries, channels)
+        hbuf, ebuf, zbuf = self._format_data(timeseries, channels)
 
-        if (len(Hbuf) + len(Ebuf) + len(Zbuf)) > 0:
+        if hbuf or ebuf or zbuf:
             out.write(' C  Date       Time     DaySec     Bin change'
             '    Voltage change\n')
-            out.write(''.join(Hbuf))
+            out.write(hbuf)
             out.write('\n')
-            out.write(''.join(Ebuf))
+            out.write(ebuf)
             out.write('\n')
-            out.write(''.join(Zbuf))
+            out.write(zbuf)
         else:
             out.write('*** No Bin Changes Found ***\n')
 
@@ -83,113 +76,106 @@ class BinLogWriter(object):
         return ''.join(buf)
 
     def _format_data(self, timeseries, channels):
-        """Format all data lines.
+        """Format bin change lines.
 
         Parameters
         ----------
             timeseries : obspy.core.Stream
                 Stream containing traces with channel listed in channels
             channels : sequence
-                List and order of channel values to output.
+                List and order of channel values to output,
+                volt and bin channels for H, E and Z.
 
         Returns
         -------
-        str
-            A string formatted to be the data lines in a BinLog file.
+        list
+            Bin change lines for H, E and Z, one str for each component.
         """
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        buf = []
+        for i, component in enumerate(('H', 'E', 'Z')):
+            if len(traces) < 2 * i + 2:
+                buf.append('')
+                continue
+            buf.append(self._format_changes(component,
+                    traces[2 * i], traces[2 * i + 1]))
+        return buf
 
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
-            if traceLocal.stats.channel == 'D':
-                traceLocal.data = \
-                    ChannelConverter.get_minutes_from_radians(traceLocal.data)
-
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
-
-            timeseriesLocal.append(traceLocal)
-
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
-
-        for i in xrange(len(traces[0].data)):
-            self._format_values(
-                datetime.utcfromtimestamp(starttime + i * delta),
-                (t.data[i] for t in traces))
-
-        return
-
-    def _format_values(self, time, values):
-        """Format one line of data values.
+    def _format_changes(self, component, volt_trace, bin_trace):
+        """Format bin change lines for one component.
 
         Parameters
         ----------
-            time : datetime
-                Timestamp for values.
-            values : sequence
-                List and order of channel values to output.
+            component : str
+                Component name used to label lines.
+            volt_trace : obspy.core.Trace
+                Trace with volt values, in millivolts.
+            bin_trace : obspy.core.Trace
+                Trace with bin values.
 
         Returns
         -------
-        unicode
-            Formatted line containing values.
+        str
+            Formatted lines, one for each sample where the bin changes
+            from the previous sample.  Changes to or from a missing bin
+            are not reported.
         """
+        bins = numpy.asarray(bin_trace.data, dtype=numpy.float64)
+        bins = numpy.where(numpy.isnan(bins), BIN_DEAD,
+                numpy.trunc(bins)).astype(numpy.int64)
+        live = bins != BIN_DEAD
+        changes = numpy.nonzero(live[1:] & live[:-1] &
+                (numpy.diff(bins) != 0))[0] + 1
+        if len(changes) == 0:
+            return ''
+        # only values around each change are converted and formatted
+        previous = changes - 1
+        volts = numpy.asarray(volt_trace.data, dtype=numpy.float64)
+        volts = numpy.concatenate((volts[previous], volts[changes]))
+        if volt_trace.stats.channel == 'D':
+            volts = ChannelConverter.get_minutes_from_radians(volts)
+        volts = numpy.where(numpy.isnan(volts), VOLT_DEAD, volts / 1000.)
+        prev_volts, next_volts = numpy.split(volts, 2)
+        label = '(' + component + ')'
+        return ''.join([self._format_change(label,
+                TimeseriesUtility.get_sample_times(bin_trace, i, i + 1)[0],
+                prev_bin, next_bin, prev_volt, next_volt)
+                for i, prev_bin, next_bin, prev_volt, next_volt in zip(
+                    changes.tolist(), bins[previous].tolist(),
+                    bins[changes].tolist(), prev_volts.tolist(),
+                    next_volts.tolist())])
+
+    def _format_change(self, label, time, prev_bin, next_bin, prev_volt,
+            next_volt):
+        """Format one bin change line.
 
-        tt = time.timetuple()
-        totalMinutes = int(tt.tm_hour * 3600 + tt.tm_min * 60 + tt.tm_sec)
-
-        timestr = '{0.tm_year:0>4d}-{0.tm_mon:0>2d}-{0.tm_mday:0>2d} ' \
-                  '{0.tm_hour:0>2d}:{0.tm_min:0>2d}:{0.tm_sec:0>2d}' \
-                  ' ({1:0>5d})'. \
-                    format(tt, totalMinutes)
-
-        # init volt/bin vals to dead
-        vdead = 99.999999
-        bdead = 999
-        vblist = [vdead, bdead, vdead, bdead, vdead, bdead]
-
-        # now "un-dead" the non-nans, format volts as float, bins as int
-        for idx, valx in enumerate(values):
-            if ~numpy.isnan(valx):
-                if idx == 0 or idx == 2 or idx == 4:
-                    vblist[idx] = valx / 1000.
-                else:
-                    vblist[idx] = int(valx)
-
-        if vblist[1] != 999 and h_prev[1] != 999 and vblist[1] != h_prev[1]:
-            Hbuf.append('{0: >3s} {1:>s}  '
-            '{2: >4d} to {3: >4d}  {4: >10.6f} to {5: >10.6f}\n'.
-            format('(H)', timestr, h_prev[1],
-                    vblist[1], h_prev[0], vblist[0]))
-
-        if vblist[3] != 999 and e_prev[1] != 999 and vblist[3] != e_prev[1]:
-            Ebuf.append('{0: >3s} {1:>s}  '
-            '{2: >4d} to {3: >4d}  {4: >10.6f} to {5: >10.6f}\n'.
-            format('(E)', timestr, e_prev[1],
-                    vblist[3], e_prev[0], vblist[2]))
-
-        if vblist[5] != 999 and z_prev[1] != 999 and vblist[5] != z_prev[1]:
-            Zbuf.append('{0: >3s} {1:>s}  '
-            '{2: >4d} to {3: >4d}  {4: >10.6f} to {5: >10.6f}\n'.
-            format('(Z)', timestr, z_prev[1],
-                    vblist[5], z_prev[0], vblist[4]))
-
-        h_prev[0] = vblist[0]
-        h_prev[1] = vblist[1]
-
-        e_prev[0] = vblist[2]
-        e_prev[1] = vblist[3]
-
-        z_prev[0] = vblist[4]
-        z_prev[1] = vblist[5]
+        Parameters
+        ----------
+            label : str
+                Component label, for example '(H)'.
+            time : numpy.datetime64
+                Timestamp for sample where the bin changed.
+            prev_bin : int
+                Bin before the change.
+            next_bin : int
+                Bin after the change.
+            prev_volt : float
+                Voltage before the change.
+            next_volt : float
+                Voltage after the change.
 
-        return
+        Returns
+        -------
+        str
+            Formatted line containing change.
+        """
+        tt = time.tolist().timetuple()
+        totalSeconds = int(tt.tm_hour * 3600 + tt.tm_min * 60 + tt.tm_sec)
+        return '%3s %04d-%02d-%02d %02d:%02d:%02d (%05d)  ' \
+                '%4d to %4d  %10.6f to %10.6f\n' % (
+                label, tt.tm_year, tt.tm_mon, tt.tm_mday,
+                tt.tm_hour, tt.tm_min, tt.tm_sec, totalSeconds,
+                prev_bin, next_bin, prev_volt, next_volt)
 
     @classmethod
     def format(self, timeseries, channels):
@@ -0,0 +1,87 @@
+"""Limit on waveserver connections shared by every EdgeFactory in a process.
+"""
+
+import contextlib
+import threading
+try:
+    # obspy 1.x
+    from obspy.clients import earthworm
+except ImportError:
+    # obspy 0.x
+    from obspy import earthworm
+
+
+class ConnectionLimiter(object):
+    """Limit the number of connections open to each waveserver at once.
+
+    obspy's earthworm client opens a new socket for every request, so
+    connections are not reused.  A limiter does not keep connections open,
+    it caps the number of sockets open to each host and port at the same
+    time, for every EdgeFactory that shares it.
+
+    Parameters
+    ----------
+    max_connections : int
+        maximum number of connections open to each host and port at the
+        same time.  ``connection`` waits when this limit is reached.
+    """
+
+    def __init__(self, max_connections=4):
+        self.max_connections = max_connections
+        # (host, port) : number of connections in use
+        self._active = {}
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def connection(self, host, port):
+        """Wait for a free connection, and use a client for one request.
+
+        Parameters
+        ----------
+        host : str
+            waveserver host.
+        port : int
+            waveserver port.
+
+        Yields
+        ------
+        earthworm.Client
+            client for host and port.
+        """
+        key = (host, port)
+        self._acquire(key)
+        try:
+            yield earthworm.Client(host, port)
+        finally:
+            self._release(key)
+
+    def _acquire(self, key):
+        """Wait while ``max_connections`` connections for key are in use.
+
+        Parameters
+        ----------
+        key : tuple
+            (host, port).
+        """
+        with self._condition:
+            while self._active.get(key, 0) >= self.max_connections:
+                self._condition.wait()
+            self._active[key] = self._active.get(key, 0) + 1
+
+    def _release(self, key):
+        """Mark one connection for key as no longer in use.
+
+        Parameters
+        ----------
+        key : tuple
+            (host, port).
+        """
+        with self._condition:
+            self._active[key] -= 1
+            if self._active[key] == 0:
+                del self._active[key]
+            self._condition.notify_all()
+
+
+# limit shared by every EdgeFactory in this process
+CONNECTION_LIMITER = ConnectionLimiter()
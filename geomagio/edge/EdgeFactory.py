@@ -2,6 +2,8 @@
 
 EdgeFactory uses obspy earthworm class to read data from any
 earthworm standard Waveserver using the obspy getWaveform call.
+Every EdgeFactory shares a limit on connections to each waveserver,
+see ConnectionLimiter.
 
 Writing will be implemented with Edge specific capabilities,
 to take advantage of it's newer realtime abilities.
@@ -9,22 +11,20 @@ to take advantage of it's newer realtime abilities.
 Edge is the USGS earthquake hazard centers replacement for earthworm.
 """
 
+import contextlib
 import sys
 import StringIO
+import threading
+from multiprocessing.pool import ThreadPool
 import numpy
 import numpy.ma
 import obspy.core
 from datetime import datetime
-try:
-    # obspy 1.x
-    from obspy.clients import earthworm
-except:
-    # obspy 0.x
-    from obspy import earthworm
 from .. import ChannelConverter, TimeseriesUtility
 from ..TimeseriesFactory import TimeseriesFactory
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..ObservatoryMetadata import ObservatoryMetadata
+from ConnectionLimiter import CONNECTION_LIMITER
 from RawInputClient import RawInputClient
 
 
@@ -63,6 +63,12 @@ class EdgeFactory(TimeseriesFactory):
     forceout: bool
         Tells edge to forceout a packet to miniseed.  Generally used when
         the user knows no more data is coming.
+    maxConnections: int
+        maximum number of channels read at the same time,
+        each using its own earthworm client.
+    connectionLimiter: ConnectionLimiter
+        limit on connections to each waveserver, optional.
+        uses the limit shared by every EdgeFactory if unspecified.
 
     See Also
     --------
@@ -79,9 +85,11 @@ class EdgeFactory(TimeseriesFactory):
     def __init__(self, host='cwbpub.cr.usgs.gov', port=2060, write_port=None,
             observatory=None, channels=None, type=None, interval=None,
             observatoryMetadata=None, locationCode=None,
-            cwbhost=None, cwbport=0, tag='GeomagAlg', forceout=False):
+            cwbhost=None, cwbport=0, tag='GeomagAlg', forceout=False,
+            maxConnections=4, connectionLimiter=None):
         TimeseriesFactory.__init__(self, observatory, channels, type, interval)
-        self.client = earthworm.Client(host, port)
+        self.connectionLimiter = connectionLimiter or CONNECTION_LIMITER
+        self.maxConnections = maxConnections
 
         self.observatoryMetadata = observatoryMetadata or ObservatoryMetadata()
         self.tag = tag
@@ -133,25 +141,11 @@ class EdgeFactory(TimeseriesFactory):
             raise TimeseriesFactoryException(
                 'Starttime before endtime "%s" "%s"' % (starttime, endtime))
 
-        # need this until https://github.com/obspy/obspy/pull/1179
-        # replace stdout
-        original_stdout = sys.stdout
-        temp_stdout = StringIO.StringIO()
-        try:
-            sys.stdout = temp_stdout
-            # get the timeseries
-            timeseries = obspy.core.Stream()
-            for channel in channels:
-                data = self._get_timeseries(starttime, endtime, observatory,
-                        channel, type, interval)
-                timeseries += data
-        # restore stdout
-        finally:
-            output = temp_stdout.getvalue()
-            if output != '':
-                sys.stderr.write(output)
-            temp_stdout.close()
-            sys.stdout = original_stdout
+        # get the timeseries
+        timeseries = obspy.core.Stream()
+        for data in self._get_channels(starttime, endtime, observatory,
+                channels, type, interval):
+            timeseries += data
         self._post_process(timeseries, starttime, endtime, channels)
 
         return timeseries
@@ -534,8 +528,12 @@ class EdgeFactory(TimeseriesFactory):
                 type, interval)
         edge_channel = self._get_edge_channel(observatory, channel,
                 type, interval)
-        data = self.client.get_waveforms(network, station, location,
-                edge_channel, starttime, endtime)
+        limiter = self.connectionLimiter
+        with limiter.connection(self.host, self.port) as client:
+            # need this until https://github.com/obspy/obspy/pull/1179
+            with _redirect_stdout_to_stderr():
+                data = client.get_waveforms(network, station, location,
+                        edge_channel, starttime, endtime)
         data.merge()
         if data.count() == 0:
             data = self._create_missing_channel(starttime, endtime,
@@ -545,6 +543,49 @@ class EdgeFactory(TimeseriesFactory):
                 observatory, channel, type, interval)
         return data
 
+    def _get_channels(self, starttime, endtime, observatory,
+                channels, type, interval):
+        """get timeseries data for several channels at the same time.
+
+        Uses up to ``self.maxConnections`` threads, one request per channel.
+        A new thread pool is created for each call; starting a few threads
+        is cheap compared to the waveserver requests, and no idle threads
+        are left behind between calls.
+
+        Parameters
+        ----------
+        starttime: obspy.core.UTCDateTime
+            the starttime of the requested data
+        endtime: obspy.core.UTCDateTime
+            the endtime of the requested data
+        observatory : str
+            observatory code
+        channels : array_like
+            list of single character channels {H, E, D, Z, F}
+        type : str
+            data type {definitive, quasi-definitive, variation}
+        interval : str
+            interval length {minute, second}
+
+        Returns
+        -------
+        list<obspy.core.Stream>
+            timeseries of each channel, in the same order as ``channels``.
+        """
+        def get_channel(channel):
+            return self._get_timeseries(starttime, endtime, observatory,
+                    channel, type, interval)
+
+        workers = min(self.maxConnections or 1, len(channels))
+        if workers <= 1:
+            return [get_channel(channel) for channel in channels]
+        pool = ThreadPool(workers)
+        try:
+            return pool.map(get_channel, channels)
+        finally:
+            pool.terminate()
+            pool.join()
+
     def _get_stream_start_end_times(self, timeseries):
         """get start and end times from a stream.
                 Traverses all traces, and find the earliest starttime, and
@@ -681,3 +722,82 @@ class EdgeFactory(TimeseriesFactory):
         for trace in stream:
             self.observatoryMetadata.set_metadata(trace.stats, observatory,
                     channel, type, interval)
+
+
+class _ThreadStdout(object):
+    """Replacement for sys.stdout that each thread can redirect separately.
+
+    Parameters
+    ----------
+    stdout : file
+        original sys.stdout, used by threads that are not redirected.
+
+    Attributes
+    ----------
+    users : int
+        number of active redirects, see ``_redirect_stdout_to_stderr``.
+    """
+    def __init__(self, stdout):
+        self._stdout = stdout
+        self._local = threading.local()
+        self.users = 0
+
+    def redirect(self, out):
+        """Redirect output from the current thread.
+
+        Parameters
+        ----------
+        out : file
+            where output is written, or None to use the original stdout.
+
+        Returns
+        -------
+        file
+            previous redirect for the current thread, or None.
+        """
+        previous = getattr(self._local, 'out', None)
+        self._local.out = out
+        return previous
+
+    def write(self, data):
+        self._get_out().write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._get_out(), name)
+
+    def _get_out(self):
+        return getattr(self._local, 'out', None) or self._stdout
+
+
+# protects installation and removal of _ThreadStdout
+_stdout_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _redirect_stdout_to_stderr():
+    """Redirect stdout of the current thread to stderr.
+
+    Other threads keep writing to stdout, so this is safe to use from
+    several threads at once.
+    sys.stdout is replaced by a ``_ThreadStdout`` only while at least one
+    thread is redirected, and restored after the last redirect ends.
+    """
+    with _stdout_lock:
+        stdout = sys.stdout
+        if not isinstance(stdout, _ThreadStdout):
+            stdout = sys.stdout = _ThreadStdout(stdout)
+        stdout.users += 1
+    out = StringIO.StringIO()
+    previous = stdout.redirect(out)
+    try:
+        yield
+    finally:
+        stdout.redirect(previous)
+        with _stdout_lock:
+            stdout.users -= 1
+            # leave sys.stdout alone if it was reassigned since
+            if stdout.users == 0 and sys.stdout is stdout:
+                sys.stdout = stdout._stdout
+        output = out.getvalue()
+        if output != '':
+            sys.stderr.write(output)
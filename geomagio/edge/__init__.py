@@ -1,11 +1,13 @@
 """IO Module for Edge Format
 """
 
+from ConnectionLimiter import ConnectionLimiter
 from EdgeFactory import EdgeFactory
 from LocationCode import LocationCode
 from RawInputClient import RawInputClient
 
 __all__ = [
+    'ConnectionLimiter',
     'EdgeFactory',
     'LocationCode',
     'RawInputClient'
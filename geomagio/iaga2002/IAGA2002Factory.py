@@ -3,7 +3,7 @@
 import obspy.core
 from .. import ChannelConverter
 from ..TimeseriesFactory import TimeseriesFactory
-from IAGA2002Parser import IAGA2002Parser
+from IAGA2002Parser import BLOCK_SIZE, IAGA2002Parser
 from IAGA2002Writer import IAGA2002Writer
 
 
@@ -31,27 +31,135 @@ class IAGA2002Factory(TimeseriesFactory):
     IAGA2002Parser
     """
 
+    # parser works directly on mapped files
+    parse_buffers = True
+
     def __init__(self, **kwargs):
         TimeseriesFactory.__init__(self, **kwargs)
 
     def parse_string(self, data, observatory=None, interval='minute',
-            **kwargs):
+            starttime=None, endtime=None, **kwargs):
         """Parse the contents of a string in the format of an IAGA2002 file.
 
         Parameters
         ----------
-        iaga2002String : str
+        data : str or buffer
             string containing IAGA2002 content.
         observatory : str
             observatory in case headers are unavailable.
             parses observatory from headers when available.
+        interval : {'minute', 'second'}
+            interval used to guess sampling rate when there is one sample.
+        starttime : obspy.core.UTCDateTime
+            only parse data at or after this time, optional.
+        endtime : obspy.core.UTCDateTime
+            only parse data at or before this time, optional.
         Returns
         -------
         obspy.core.Stream
             parsed data.
         """
         parser = IAGA2002Parser(observatory=observatory)
-        parser.parse(data)
+        parser.parse(data, starttime=starttime, endtime=endtime)
+        if len(parser.times) == 0:
+            # no data in requested window
+            return obspy.core.Stream()
+        return self._get_stream(parser, interval)
+
+    def parse_stream(self, fh, observatory=None, interval='minute',
+            starttime=None, endtime=None, size=BLOCK_SIZE, **kwargs):
+        """Incrementally parse IAGA2002 content from a file handle.
+
+        Parameters
+        ----------
+        fh : file
+            file handle positioned at the start of IAGA2002 content.
+        observatory : str
+            observatory in case headers are unavailable.
+            parses observatory from headers when available.
+        interval : {'minute', 'second'}
+            interval used to guess sampling rate when there is one sample.
+        starttime : obspy.core.UTCDateTime
+            only parse data at or after this time, optional.
+        endtime : obspy.core.UTCDateTime
+            only parse data at or before this time, optional.
+        size : int
+            maximum number of samples in each yielded stream.
+
+        Yields
+        ------
+        obspy.core.Stream
+            one stream for each block of parsed data, with one trace
+            per channel.
+        """
+        parser = IAGA2002Parser(observatory=observatory)
+        rate = None
+        for block in parser.parse_stream(fh, size=size,
+                starttime=starttime, endtime=endtime):
+            stream = self._get_stream(block, interval, rate)
+            rate = stream[0].stats.sampling_rate
+            yield stream
+
+    def parse_inventory(self, head, tail, observatory=None, type=None,
+            interval='minute', **kwargs):
+        """Parse inventory from the beginning and end of an IAGA2002 file.
+
+        Parameters
+        ----------
+        head : str
+            beginning of IAGA2002 content.
+        tail : str
+            end of IAGA2002 content.
+        observatory : str
+            observatory in case headers are unavailable.
+        type : str
+            data type in case headers are unavailable.
+        interval : {'minute', 'second'}
+            interval in case headers are unavailable.
+
+        Returns
+        -------
+        dict
+            inventory, see ``TimeseriesFactory.parse_inventory``.
+        """
+        parser = IAGA2002Parser(observatory=observatory)
+        if not parser.parse_inventory(head, tail):
+            return None
+        metadata = parser.metadata
+        data_interval = metadata.get('data_interval_type', '')
+        if '1-second' in data_interval:
+            interval = 'second'
+        elif '1-minute' in data_interval:
+            interval = 'minute'
+        data_type = metadata.get('data_type', type)
+        if data_type is not None:
+            data_type = data_type.lower()
+        return {
+            'station': metadata['station'],
+            'channels': parser.channels,
+            'type': data_type,
+            'interval': interval,
+            'starttime': obspy.core.UTCDateTime(parser.times[0]),
+            'endtime': obspy.core.UTCDateTime(parser.times[-1])
+        }
+
+    def _get_stream(self, parser, interval, rate=None):
+        """Create a stream from parsed data.
+
+        Parameters
+        ----------
+        parser : IAGA2002Parser
+            parser with at least one parsed sample.
+        interval : {'minute', 'second'}
+            interval used to guess sampling rate when there is one sample.
+        rate : float
+            sampling rate to use when there is one sample, optional.
+
+        Returns
+        -------
+        obspy.core.Stream
+            stream with one trace per parsed channel.
+        """
         metadata = parser.metadata
         starttime = obspy.core.UTCDateTime(parser.times[0])
         endtime = obspy.core.UTCDateTime(parser.times[-1])
@@ -60,10 +168,10 @@ class IAGA2002Factory(TimeseriesFactory):
         length = len(data[data.keys()[0]])
         if starttime != endtime:
             rate = (length - 1) / (endtime - starttime)
-        else:
+        elif rate is None:
             # guess based on args
             if interval == 'minute':
-                rate = 1 / 60
+                rate = 1 / 60.
             elif interval == 'second':
                 rate = 1
             else:
@@ -92,3 +200,29 @@ class IAGA2002Factory(TimeseriesFactory):
             list of channels to store
         """
         IAGA2002Writer().write(fh, timeseries, channels)
+
+    def write_file_header(self, fh, timeseries, channels):
+        """writes file headers to the given file object.
+
+        Parameters
+        ----------
+        fh: file object
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : array_like
+            list of channels to store
+        """
+        IAGA2002Writer().write_header(fh, timeseries, channels)
+
+    def write_file_data(self, fh, timeseries, channels):
+        """writes fixed width data lines to the given file object.
+
+        Parameters
+        ----------
+        fh: file object
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : array_like
+            list of channels to store
+        """
+        IAGA2002Writer().write_data(fh, timeseries, channels)
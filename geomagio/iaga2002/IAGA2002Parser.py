@@ -1,8 +1,11 @@
 """Parsing methods for the IAGA2002 Format."""
 
 
+import itertools
 import numpy
 from datetime import datetime
+from obspy.core import UTCDateTime
+from ..Util import get_fixed_width_column, get_fixed_width_rows
 
 # values that represent missing data points in IAGA2002
 EIGHTS = numpy.float64('88888.88')
@@ -11,6 +14,15 @@ NINES = numpy.float64('99999.99')
 # placeholder channel name used when less than 4 channels are being written.
 EMPTY_CHANNEL = 'NUL'
 
+# number of data lines parsed at a time by parse_stream
+BLOCK_SIZE = 86400
+
+# minimum width of a data line, not including line ending
+DATA_LINE_WIDTH = 70
+# column positions of fixed characters in data lines
+DATA_LINE_SEPARATORS = ((4, '-'), (7, '-'), (10, ' '), (13, ':'), (16, ':'),
+        (19, '.'))
+
 
 class IAGA2002Parser(object):
     """IAGA2002 parser.
@@ -53,30 +65,143 @@ class IAGA2002Parser(object):
         # temporary storage for data being parsed
         self._parsedata = None
 
-    def parse(self, data):
+    def parse(self, data, starttime=None, endtime=None):
         """Parse a string containing IAGA2002 formatted data.
 
         Parameters
         ----------
-        data : str
+        data : str or buffer
             IAGA 2002 formatted file contents.
+        starttime : obspy.core.UTCDateTime
+            skip data lines before this time, optional.
+        endtime : obspy.core.UTCDateTime
+            skip data lines after this time, optional.
+        """
+        position = 0
+        length = len(data)
+        while position < length:
+            end = data.find('\n', position)
+            if end == -1:
+                end = length
+            line = data[position:end].rstrip('\r')
+            position = end + 1
+            if not self._parse_header_section(line):
+                break
+        self._parse_data_block(data, position, starttime, endtime)
+        self._post_process()
+
+    def parse_stream(self, fh, size=BLOCK_SIZE, starttime=None,
+            endtime=None):
+        """Incrementally parse IAGA2002 formatted data from a file handle.
+
+        Headers are parsed first, then data lines are read and decoded
+        ``size`` lines at a time, so memory use does not depend on the
+        length of the file.
+
+        Parameters
+        ----------
+        fh : file
+            file handle positioned at the start of IAGA 2002 content.
+        size : int
+            maximum number of data lines in each block.
+        starttime : obspy.core.UTCDateTime
+            skip data lines before this time, optional.
+        endtime : obspy.core.UTCDateTime
+            stop reading after this time, optional.
+
+        Yields
+        ------
+        IAGA2002Parser
+            this parser, once for each block of data lines that has data
+            within the window.  ``self.times`` and ``self.data`` only
+            contain values from the current block.
         """
-        parsing_headers = True
-        lines = data.splitlines()
+        lines = iter(fh)
         for line in lines:
-            if parsing_headers:
-                if line.startswith(' ') and line.endswith('|'):
-                    # still in headers
-                    if line.startswith(' #'):
-                        self._parse_comment(line)
-                    else:
-                        self._parse_header(line)
-                else:
-                    parsing_headers = False
-                    self._parse_channels(line)
+            if not self._parse_header_section(line.rstrip('\r\n')):
+                break
+        self.comments = self._merge_comments(self.comments)
+        self.parse_comments()
+        if endtime is not None:
+            endtime = UTCDateTime(endtime).datetime
+        while True:
+            block = list(itertools.islice(lines, size))
+            if len(block) == 0:
+                break
+            self._parsedata = ([], [], [], [], [])
+            self._parse_data_block(''.join(block), 0, starttime, endtime)
+            self._post_process_data()
+            if len(self.times) > 0:
+                yield self
+            if endtime is None:
+                continue
+            last = next((line for line in reversed(block) if line.strip()),
+                    None)
+            if last is not None and self._parse_time(last) >= endtime:
+                # remaining lines are after the window
+                break
+
+    def parse_inventory(self, head, tail):
+        """Parse headers, and times of the first and last data lines.
+
+        Parameters
+        ----------
+        head : str
+            beginning of IAGA 2002 formatted file contents,
+            including headers and first data line.
+        tail : str
+            end of IAGA 2002 formatted file contents,
+            including last data line.
+
+        Returns
+        -------
+        bool
+            True if headers and data line times were parsed,
+            and ``self.times`` contains the first and last time.
+            False if ``head`` or ``tail`` were incomplete.
+        """
+        # last line of head may be incomplete
+        lines = head.split('\n')[:-1]
+        for index, line in enumerate(lines):
+            if not self._parse_header_section(line.rstrip('\r')):
+                break
+        else:
+            return False
+        if index + 1 == len(lines):
+            return False
+        first = lines[index + 1]
+        last = tail.rstrip().rsplit('\n', 1)[-1]
+        if len(first.rstrip()) < DATA_LINE_WIDTH or \
+                len(last) < DATA_LINE_WIDTH:
+            return False
+        self.comments = self._merge_comments(self.comments)
+        self.parse_comments()
+        self.times = [self._parse_time(first), self._parse_time(last)]
+        return True
+
+    def _parse_header_section(self, line):
+        """Parse one line before the data lines.
+
+        Parameters
+        ----------
+        line : str
+            header, comment, or channel line.
+
+        Returns
+        -------
+        bool
+            True if the line was a header or comment,
+            False if the line was the channel line that ends the headers.
+        """
+        if line.startswith(' ') and line.endswith('|'):
+            # still in headers
+            if line.startswith(' #'):
+                self._parse_comment(line)
             else:
-                self._parse_data(line)
-        self._post_process()
+                self._parse_header(line)
+            return True
+        self._parse_channels(line)
+        return False
 
     def _parse_header(self, line):
         """Parse header line.
@@ -140,26 +265,192 @@ class IAGA2002Parser(object):
         # create parsing data arrays
         self._parsedata = ([], [], [], [], [])
 
+    def _parse_data_block(self, data, offset, starttime=None, endtime=None):
+        """Parse all data lines at once.
+
+        Data lines are fixed width, and are decoded as columns of a 2
+        dimensional byte array instead of one line at a time.
+        When a time window is given, only lines within the window are
+        decoded; their position is found with a binary search on the time
+        column.
+        Falls back to ``_parse_data`` for each line when lines are not
+        all well formed.
+
+        Parameters
+        ----------
+        data : str
+            IAGA 2002 formatted file contents.
+        offset : int
+            position of the first data line in ``data``.
+        starttime : obspy.core.UTCDateTime
+            skip data lines before this time, optional.
+        endtime : obspy.core.UTCDateTime
+            skip data lines after this time, optional.
+        """
+        rows = get_fixed_width_rows(data, offset)
+        if rows is not None and self._is_data_block(rows):
+            try:
+                start = 0
+                end = len(rows)
+                if starttime is not None:
+                    start = self._search_rows(rows, starttime, 'left')
+                if endtime is not None:
+                    end = self._search_rows(rows, endtime, 'right')
+                self._parsedata = self._parse_data_rows(rows[start:end])
+                return
+            except ValueError:
+                # fall back to parsing one line at a time
+                pass
+        for line in data[offset:].splitlines():
+            # skip blank lines, like trailing whitespace
+            if line.strip():
+                self._parse_data(line)
+        if starttime is not None or endtime is not None:
+            self._trim_parsedata(starttime, endtime)
+
+    def _parse_data_rows(self, rows):
+        """Decode fixed width data lines.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            2 dimensional array of bytes, one row per data line.
+
+        Returns
+        -------
+        tuple
+            parsed times, followed by one array of values per channel
+            (None for empty channels).
+
+        Raises
+        ------
+        ValueError
+            if any time or value cannot be decoded.
+        """
+        times = get_fixed_width_column(rows, 0, 23, 'datetime64[ms]')
+        parsedata = [times.tolist()]
+        for i, channel in enumerate(self.channels):
+            if channel == EMPTY_CHANNEL:
+                parsedata.append(None)
+                continue
+            start = 31 + i * 10
+            parsedata.append(get_fixed_width_column(rows, start, start + 9))
+        return tuple(parsedata)
+
+    def _search_rows(self, rows, time, side):
+        """Find the index of a time in fixed width data lines.
+
+        Data lines are assumed to be in time order.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            2 dimensional array of bytes, one row per data line.
+        time : obspy.core.UTCDateTime
+            time to find.
+        side : {'left', 'right'}
+            'left' returns the index of the first line at or after time,
+            'right' returns the index of the first line after time.
+
+        Returns
+        -------
+        int
+            index where time would be inserted to keep rows in order.
+
+        Raises
+        ------
+        ValueError
+            if a time cannot be decoded.
+        """
+        time = numpy.datetime64(UTCDateTime(time).datetime, 'ms')
+        low = 0
+        high = len(rows)
+        while low < high:
+            middle = (low + high) // 2
+            row_time = get_fixed_width_column(rows[middle:middle + 1], 0, 23,
+                    'datetime64[ms]')[0]
+            if row_time < time or (side == 'right' and row_time == time):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _trim_parsedata(self, starttime, endtime):
+        """Remove parsed data lines outside a time window.
+
+        Parameters
+        ----------
+        starttime : obspy.core.UTCDateTime
+            remove data lines before this time, optional.
+        endtime : obspy.core.UTCDateTime
+            remove data lines after this time, optional.
+        """
+        if starttime is not None:
+            starttime = UTCDateTime(starttime).datetime
+        if endtime is not None:
+            endtime = UTCDateTime(endtime).datetime
+        keep = [i for i, time in enumerate(self._parsedata[0])
+                if (starttime is None or time >= starttime) and
+                        (endtime is None or time <= endtime)]
+        self._parsedata = tuple([d[i] for i in keep]
+                for d in self._parsedata)
+
+    def _is_data_block(self, rows):
+        """Check whether fixed width rows are IAGA2002 data lines.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            2 dimensional array of bytes, one row per line.
+
+        Returns
+        -------
+        bool
+            True if every row is wide enough and has date/time separators
+            in the expected columns.
+        """
+        if rows.shape[1] <= DATA_LINE_WIDTH:
+            return False
+        for column, separator in DATA_LINE_SEPARATORS:
+            if not numpy.all(rows[:, column] == ord(separator)):
+                return False
+        return True
+
     def _parse_data(self, line):
         """Parse one data point in the timeseries.
 
         Adds time to ``self.times``.
         Adds channel values to ``self.data``.
         """
+        time = self._parse_time(line)
+        t, d1, d2, d3, d4 = self._parsedata
+        t.append(time)
+        d1.append(line[31:40])
+        d2.append(line[41:50])
+        d3.append(line[51:60])
+        d4.append(line[61:70])
+
+    def _parse_time(self, line):
+        """Parse the time of one data line.
+
+        Parameters
+        ----------
+        line : str
+            data line.
+
+        Returns
+        -------
+        datetime
+            time of data line.
+        """
         # parsing time components is much faster
-        time = datetime(
+        return datetime(
                 # date
                 int(line[0:4]), int(line[5:7]), int(line[8:10]),
                 # time
                 int(line[11:13]), int(line[14:16]), int(line[17:19]),
                 # microseconds
                 int(line[20:23]) * 1000)
-        t, d1, d2, d3, d4 = self._parsedata
-        t.append(time)
-        d1.append(line[31:40])
-        d2.append(line[41:50])
-        d3.append(line[51:60])
-        d4.append(line[61:70])
 
     def _post_process(self):
         """Post processing after data is parsed.
@@ -171,12 +462,20 @@ class IAGA2002Parser(object):
         """
         self.comments = self._merge_comments(self.comments)
         self.parse_comments()
+        self._post_process_data()
+
+    def _post_process_data(self):
+        """Convert parsed data to numpy arrays.
+
+        Replaces empty values with ``numpy.nan``.
+        """
         self.times = self._parsedata[0]
+        self.data = {}
         for channel, data in zip(self.channels, self._parsedata[1:]):
             # ignore "empty" channels
             if channel == EMPTY_CHANNEL:
                 continue
-            data = numpy.array(data, dtype=numpy.float64)
+            data = numpy.asarray(data, dtype=numpy.float64)
             data[data == int(EIGHTS)] = numpy.nan
             data[data == EIGHTS] = numpy.nan
             data[data == NINES] = numpy.nan
@@ -1,22 +1,30 @@
 
 from cStringIO import StringIO
-from datetime import datetime
+import itertools
 import numpy
 import textwrap
-from .. import ChannelConverter, TimeseriesUtility
+from obspy.core import Stream
+from .. import TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..Util import create_empty_trace
 import IAGA2002Parser
 
+# number of data lines formatted and written at a time
+BLOCK_SIZE = 1440
+
 
 class IAGA2002Writer(object):
     """IAGA2002 writer.
     """
 
     def __init__(self, empty_value=IAGA2002Parser.NINES,
-            empty_channel=IAGA2002Parser.EMPTY_CHANNEL):
+            empty_channel=IAGA2002Parser.EMPTY_CHANNEL,
+            block_size=BLOCK_SIZE):
         self.empty_value = empty_value
         self.empty_channel = empty_channel
+        self.block_size = block_size
+        # scratch array reused for each block of output values
+        self._values = None
 
     def write(self, out, timeseries, channels):
         """write timeseries to iaga file
@@ -30,18 +38,79 @@ class IAGA2002Writer(object):
         channels: array_like
             channels to be written from timeseries object
         """
+        self.write_header(out, timeseries, channels)
+        self.write_data(out, timeseries, channels)
+
+    def write_header(self, out, timeseries, channels):
+        """write iaga file headers, comments and channel line
+
+        Parameters
+        ----------
+        out: file object
+            file object to be written to. could be stdout
+        timeseries: obspy.core.stream
+            timeseries object with metadata to be written
+        channels: array_like
+            channels to be written from timeseries object
+        """
+        timeseries, channels = self._get_output_channels(timeseries, channels)
+        stats = timeseries[0].stats
+        out.write(self._format_headers(stats, channels))
+        out.write(self._format_comments(stats))
+        out.write(self._format_channels(channels, stats.station))
+
+    def write_data(self, out, timeseries, channels):
+        """write iaga data lines
+
+        Every data line has the same width.
+
+        Parameters
+        ----------
+        out: file object
+            file object to be written to. could be stdout
+        timeseries: obspy.core.stream
+            timeseries object with data to be written
+        channels: array_like
+            channels to be written from timeseries object
+        """
+        timeseries, channels = self._get_output_channels(timeseries, channels)
+        count = len(timeseries.select(channel=channels[0])[0].data)
+        for start in xrange(0, count, self.block_size):
+            out.write(self._format_data(timeseries, channels,
+                    start, start + self.block_size))
+
+    def _get_output_channels(self, timeseries, channels):
+        """Check and pad channels for output.
+
+        Parameters
+        ----------
+        timeseries: obspy.core.stream
+            timeseries object with data to be written
+        channels: array_like
+            channels to be written from timeseries object
+
+        Returns
+        -------
+        tuple
+            (timeseries, channels), where channels are the four channels to
+            be written, padded with self.empty_channel as needed, and
+            timeseries is a stream that also contains empty traces for
+            padded channels.  ``timeseries`` is not modified.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if any channel is missing from timeseries.
+        """
         for channel in channels:
             if timeseries.select(channel=channel).count() == 0:
                 raise TimeseriesFactoryException(
                     'Missing channel "%s" for output, available channels %s' %
                     (channel, str(TimeseriesUtility.get_channels(timeseries))))
-        stats = timeseries[0].stats
         if len(channels) != 4:
-            channels = self._pad_to_four_channels(timeseries, channels)
-        out.write(self._format_headers(stats, channels))
-        out.write(self._format_comments(stats))
-        out.write(self._format_channels(channels, stats.station))
-        out.write(self._format_data(timeseries, channels))
+            timeseries, channels = self._pad_to_four_channels(timeseries,
+                    channels)
+        return (timeseries, channels)
 
     def _format_headers(self, stats, channels):
         """format headers for IAGA2002 file
@@ -198,8 +267,8 @@ class IAGA2002Writer(object):
         buf.append('|\n')
         return ''.join(buf)
 
-    def _format_data(self, timeseries, channels):
-        """Format all data lines.
+    def _format_data(self, timeseries, channels, start=0, end=None):
+        """Format data lines.
 
         Parameters
         ----------
@@ -207,52 +276,65 @@ class IAGA2002Writer(object):
             stream containing traces with channel listed in channels
         channels : sequence
             list and order of channel values to output.
+        start : int
+            index of first sample to format.
+        end : int
+            index after last sample to format, optional.
+            formats all remaining samples if unspecified.
         """
-        buf = []
-        if timeseries.select(channel='D'):
-            d = timeseries.select(channel='D')
-            d[0].data = ChannelConverter.get_minutes_from_radians(d[0].data)
         traces = [timeseries.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
-        for i in xrange(len(traces[0].data)):
-            buf.append(self._format_values(
-                datetime.utcfromtimestamp(starttime + i * delta),
-                (t.data[i] for t in traces)))
-        return ''.join(buf)
+        count = len(traces[0].data)
+        if end is None or end > count:
+            end = count
+        values = TimeseriesUtility.get_output_values(traces, start, end,
+                self._values, convert_d=True)
+        self._values = values
+        values[numpy.isnan(values)] = self.empty_value
+        times = TimeseriesUtility.get_sample_times(traces[0], start, end)
+        return self._format_values(times, values.T)
 
-    def _format_values(self, time, values):
-        """Format one line of data values.
+    def _format_values(self, times, values):
+        """Format data lines.
 
         Parameters
         ----------
-        time : datetime
-            timestamp for values
-        values : sequence
-            list and order of channel values to output.
-            if value is NaN, self.empty_value is output in its place.
+        times : numpy.ndarray
+            array of numpy.datetime64, timestamp for each line.
+        values : numpy.ndarray
+            2 dimensional array with one row per line,
+            and one column per channel in output order.
+            values should not be NaN, use self.empty_value instead.
 
         Returns
         -------
-        unicode
-            Formatted line containing values.
+        str
+            Formatted lines containing values.
         """
-        tt = time.timetuple()
-        return '{0.tm_year:0>4d}-{0.tm_mon:0>2d}-{0.tm_mday:0>2d} ' \
-                '{0.tm_hour:0>2d}:{0.tm_min:0>2d}:{0.tm_sec:0>2d}.{1:0>3d} ' \
-                '{0.tm_yday:0>3d}   ' \
-                '{2:10.2f}{3:10.2f}{4:10.2f}{5:10.2f}\n'.format(
-                tt, int(time.microsecond / 1000),
-                *[self.empty_value if numpy.isnan(val) else val
-                        for val in values])
+        count = len(times)
+        if count == 0:
+            return ''
+        times = times.astype('datetime64[ms]')
+        # 'YYYY-MM-DD HH:MM:SS.sss'
+        dates = numpy.datetime_as_string(times).astype('S23')
+        dates.view(numpy.uint8).reshape(count, 23)[:, 10] = ord(' ')
+        days = times.astype('datetime64[D]')
+        years = times.astype('datetime64[Y]').astype('datetime64[D]')
+        doy = (days - years).astype(numpy.int64) + 1
+        columns = [dates.tolist(), doy.tolist()]
+        columns.extend(values.T.tolist())
+        line = '%s %03d   ' + '%10.2f' * len(values[0]) + '\n'
+        return (line * count) % tuple(itertools.chain(*zip(*columns)))
 
     def _pad_to_four_channels(self, timeseries, channels):
-        padded = channels[:]
+        padded = list(channels)
+        # copy of stream, so callers do not see empty traces
+        timeseries = Stream(list(timeseries))
         for x in range(len(channels), 4):
             channel = self.empty_channel
             padded.append(channel)
-            timeseries += create_empty_trace(timeseries[0], channel)
-        return padded
+            if timeseries.select(channel=channel).count() == 0:
+                timeseries += create_empty_trace(timeseries[0], channel)
+        return (timeseries, padded)
 
     @classmethod
     def format(self, timeseries, channels):
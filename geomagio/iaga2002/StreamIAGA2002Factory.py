@@ -30,7 +30,9 @@ class StreamIAGA2002Factory(IAGA2002Factory):
         """
         return IAGA2002Factory.parse_string(self,
                 data=self._stream.read(),
-                observatory=observatory)
+                observatory=observatory,
+                starttime=starttime,
+                endtime=endtime)
 
     def put_timeseries(self, timeseries, starttime=None, endtime=None,
             channels=None, type=None, interval=None):
@@ -56,3 +56,32 @@ class IMFV122Factory(TimeseriesFactory):
                     data[channel])
             stream += obspy.core.Trace(data[channel], stats)
         return stream
+
+    def parse_inventory(self, head, tail, type=None, **kwargs):
+        """Parse inventory from the beginning and end of an IMFV122 file.
+
+        Parameters
+        ----------
+        head : str
+            beginning of IMFV122 content.
+        tail : str
+            end of IMFV122 content.
+        type : str
+            data type.
+
+        Returns
+        -------
+        dict
+            inventory, see ``TimeseriesFactory.parse_inventory``.
+        """
+        parser = IMFV122Parser()
+        if not parser.parse_inventory(head, tail):
+            return None
+        return {
+            'station': parser.metadata['station'],
+            'channels': parser.channels,
+            'type': type,
+            'interval': 'minute',
+            'starttime': parser.times[0],
+            'endtime': parser.times[-1]
+        }
@@ -46,22 +46,81 @@ class IMFV122Parser(object):
         self._parsedata = ([], [], [], [], [])
 
     def parse(self, data):
-        """Parse a string containing IAGA2002 formatted data.
+        """Parse a string containing IMFV122 formatted data.
 
         Parameters
         ----------
         data : str
-            IAGA 2002 formatted file contents.
+            IMFV122 formatted file contents.
         """
         station = data[0:3]
-        lines = data.splitlines()
-        for line in lines:
-            if line.startswith(station):
-                self._parse_header(line)
-            else:
-                self._parse_data(line)
+        times = []
+        values = []
+        start = 0
+        while start < len(data):
+            end = data.find('\n', start)
+            if end == -1:
+                end = len(data)
+            self._parse_header(data[start:end])
+            # data block continues until the next header line
+            start = data.find('\n' + station, end)
+            if start == -1:
+                start = len(data)
+            block_times, block_values = self._parse_data_block(
+                    data[end:start])
+            times.append(block_times)
+            values.append(block_values)
+            start += 1
+        if len(values) > 0:
+            times = numpy.concatenate(times)
+            values = numpy.concatenate(values)
+            self._parsedata = (times.tolist(),) + tuple(values.T)
         self._post_process()
 
+    def parse_inventory(self, head, tail):
+        """Parse first header, and times of the first and last samples.
+
+        Parameters
+        ----------
+        head : str
+            beginning of IMFV122 formatted file contents,
+            including first header line.
+        tail : str
+            end of IMFV122 formatted file contents,
+            including last header line.
+
+        Returns
+        -------
+        bool
+            True if header and sample times were parsed,
+            ``self.times`` contains the first and last time,
+            and ``self.channels`` contains channels from both headers.
+            False if ``head`` or ``tail`` were incomplete.
+        """
+        end = head.find('\n')
+        if end == -1:
+            return False
+        station = head[0:3]
+        self._parse_header(head[:end])
+        first = self._nexttime
+        channels = self.channels
+        # first line of tail may be incomplete
+        start = tail.rfind('\n' + station)
+        if start == -1:
+            return False
+        end = tail.find('\n', start + 1)
+        if end == -1:
+            return False
+        self._parse_header(tail[start + 1:end])
+        # components change when instrument orientation changes
+        self.channels = channels + [channel for channel in self.channels
+                if channel not in channels]
+        count = len(tail[end:].split()) / 4
+        if count == 0:
+            return False
+        self.times = [first, self._nexttime + (count - 1) * self._delta]
+        return True
+
     def _parse_header(self, line):
         """Parse header line.
 
@@ -107,6 +166,35 @@ class IMFV122Parser(object):
                 hour=hour,
                 minute=minute)
 
+    def _parse_data_block(self, data):
+        """Parse all data lines following a header at once.
+
+        Parameters
+        ----------
+        data : str
+            data lines following a header line.
+
+        Returns
+        -------
+        tuple
+            times, as array of numpy.datetime64,
+            and values with one column per channel,
+            as 2 dimensional array of numpy.float64.
+
+        Raises
+        ------
+        ValueError
+            if values cannot be converted, or the number of values is not
+            a multiple of the number of channels.
+        """
+        values = numpy.array(data.split(), dtype=numpy.float64)
+        values = values.reshape(-1, 4)
+        count = len(values)
+        times = numpy.datetime64(self._nexttime.datetime, 'ms') + \
+                numpy.arange(count) * numpy.timedelta64(self._delta, 's')
+        self._nexttime = self._nexttime + count * self._delta
+        return times, values
+
     def _parse_data(self, line):
         """Parse one data point in the timeseries.
 
@@ -64,11 +64,9 @@ class GOESIMFV283Factory(IMFV283Factory):
         self.criteria_file_name = observatory + '.sc'
         timeseries = Stream()
         output = self._retrieve_goes_messages(starttime, endtime, observatory)
-        timeseries += self.parse_string(output)
-        # merge channel traces for multiple days
-        timeseries.merge()
-        # trim to requested start/end time
-        timeseries.trim(starttime, endtime)
+        # parsed traces span the requested start/end time
+        timeseries += self.parse_string(output,
+                starttime=starttime, endtime=endtime)
         # output the number of points we read for logging
         if len(timeseries):
             print >> sys.stderr, "Read %s points from %s" % \
@@ -1,6 +1,5 @@
 """Factory that loads IAGA2002 Files."""
 
-import numpy
 from .. import ChannelConverter
 from ..TimeseriesFactory import TimeseriesFactory
 from IMFV283Parser import IMFV283Parser
@@ -70,13 +69,17 @@ class IMFV283Factory(TimeseriesFactory):
                     stats.channel, 'variation', 'minute')
         return timeseries
 
-    def parse_string(self, data, **kwargs):
+    def parse_string(self, data, starttime=None, endtime=None, **kwargs):
         """Parse the contents of a string in the format of an IMFV283 file.
 
         Parameters
         ----------
         data : str
             string containing IMFV283 content.
+        starttime : obspy.core.UTCDateTime
+            time of first sample, optional.
+        endtime : obspy.core.UTCDateTime
+            time of last sample, optional.
 
         Returns
         -------
@@ -84,15 +87,9 @@ class IMFV283Factory(TimeseriesFactory):
             parsed data.
         """
         parser = IMFV283Parser()
-        parser.parse(data)
+        parser.parse(data, starttime=starttime, endtime=endtime)
 
         stream = parser.stream
-        stream.merge()
-
-        for trace in stream:
-            if isinstance(trace.data, numpy.ma.MaskedArray):
-                trace.data.set_fill_value(numpy.nan)
-                trace.data = trace.data.filled()
         if stream.select(channel='D').count() > 0:
             for trace in stream.select(channel='D'):
                 trace.data = ChannelConverter.get_radians_from_minutes(
@@ -13,6 +13,8 @@ DEAD_VALUE = 65535
 HEADER_SIZE = 37
 MSG_SIZE_100B = 190
 MSG_SIZE_300B = 191
+# size of the encoded "ness" block, 63 groups of 3 bytes
+NESS_BLOCK_SIZE = 189
 BIAS = 8192
 SHIFT = 1048576
 
@@ -60,14 +62,25 @@ class IMFV283Parser(object):
         self._parsedata = None
         self.stream = obspy.core.Stream()
 
-    def parse(self, data):
+    def parse(self, data, starttime=None, endtime=None):
         """Parse a string containing IMFV283 formatted data.
 
+        All messages are decoded at once, see ``_process_ness_blocks``.
+
         Parameters
         ----------
         data : str
             IMFV283 formatted file contents.
+        starttime : obspy.core.UTCDateTime
+            time of first sample, optional.
+            defaults to the time of the earliest message.
+        endtime : obspy.core.UTCDateTime
+            time of last sample, optional.
+            defaults to the time of the last sample of the latest message.
         """
+        msg_headers = []
+        msg_lines = []
+        ness_blocks = []
         lines = data.splitlines()
         for line in lines:
             # if line isn't at least 37 characters, there's no need to proceed.
@@ -84,52 +97,74 @@ class IMFV283Parser(object):
                     sys.stderr.write('Incorrect data Length \n')
                     continue
 
-                goes_data = self._process_ness_block(
-                        line,
-                        imfv283_codes.OBSERVATORIES[msg_header['obs']],
-                        data_len)
-
-                goes_header = self._parse_goes_header(goes_data)
-                data = self._get_data(goes_header, goes_data)
-                self._post_process(data, msg_header, goes_header)
+                offset = self._get_data_offset(data_len)
+                ness_block = line[offset:offset + NESS_BLOCK_SIZE]
+                if len(ness_block) != NESS_BLOCK_SIZE:
+                    raise IndexError('ness block too short')
+                msg_header['domsat'] = \
+                        imfv283_codes.OBSERVATORIES[msg_header['obs']]
             except (KeyError, IndexError, ValueError):
                 sys.stderr.write("Incorrect data line ")
                 sys.stderr.write(line)
+                continue
+            msg_headers.append(msg_header)
+            msg_lines.append(line)
+            ness_blocks.append(ness_block)
+        if len(msg_headers) == 0:
+            return
 
-    def _get_data(self, header, data):
-        """get data from data packet
+        ness = numpy.frombuffer(''.join(ness_blocks), dtype=numpy.uint8)
+        swap_hdr = [h['domsat']['swap_hdr'] for h in msg_headers]
+        swap_data = [h['domsat']['swap_data'] for h in msg_headers]
+        goes_data = self._process_ness_blocks(ness.reshape(-1, 63, 3),
+                swap_hdr, swap_data)
+        goes_headers = self._parse_goes_headers(goes_data)
+        # skip messages whose data header has no valid day or minute
+        valid = (goes_headers['day'] >= 1) & (goes_headers['day'] <= 366) & \
+                (goes_headers['minute'] < 24 * 60)
+        if not numpy.all(valid):
+            for i in numpy.flatnonzero(~valid):
+                sys.stderr.write("Incorrect data line ")
+                sys.stderr.write(msg_lines[i])
+            if not numpy.any(valid):
+                return
+            msg_headers = [msg_headers[i] for i in numpy.flatnonzero(valid)]
+            goes_data = goes_data[valid]
+            goes_headers = dict((key, value[valid])
+                    for key, value in goes_headers.iteritems())
+        data = self._get_data(goes_headers, goes_data)
+        self._post_process(data, msg_headers, goes_headers,
+                starttime, endtime)
+
+    def _get_data(self, headers, data):
+        """get data from data packets
 
         Parameters
         ----------
-        header : dict
-            contains the header information for the data packet
-        data : bytearray
-            contains the encoded channel data
+        headers : dict
+            contains the header arrays for the data packets,
+            see ``_parse_goes_headers``.
+        data : numpy.ndarray
+            array of uint8 with shape (messages, 126),
+            contains the encoded channel data.
         Returns
         -------
-        dict
-            dictionary of channel data arrays.
+        numpy.ndarray
+            array of float64 with shape (messages, 4, 12),
+            channel values in nanotesla, numpy.nan where values are missing.
         """
-        parse_data = {}
-        channels = CHANNELS[header['orient']]
-        for channel in channels:
-            parse_data[channel] = []
-
-        bytecount = 30
-        for cnt in xrange(0, 12):
-            # get data in 2 byte pairs as integers.
-            d1 = 0x100 * data[bytecount] + data[bytecount + 1]
-            d2 = 0x100 * data[bytecount + 2] + data[bytecount + 3]
-            d3 = 0x100 * data[bytecount + 4] + data[bytecount + 5]
-            d4 = 0x100 * data[bytecount + 6] + data[bytecount + 7]
-            bytecount += 8
-
-            parse_data[channels[0]].append(d1)
-            parse_data[channels[1]].append(d2)
-            parse_data[channels[2]].append(d3)
-            parse_data[channels[3]].append(d4)
-
-        return parse_data
+        # 12 samples of 4 channels, as 2 byte pairs
+        values = data[:, 30:126].astype(numpy.int64).reshape(-1, 12, 4, 2)
+        values = values[:, :, :, 0] * 0x100 + values[:, :, :, 1]
+        values = values.transpose(0, 2, 1).astype(numpy.float64)
+        values[values == DEAD_VALUE] = numpy.nan
+        # Data values need to be scaled, offset and shifted into the
+        # correct 10th nanotesla value.
+        # For our convenience we convert to nanotesla values.
+        values *= headers['scale'][:, :, numpy.newaxis]
+        values += (headers['offset'] * BIAS - SHIFT)[:, :, numpy.newaxis]
+        values /= 10.0
+        return values
 
     def _get_data_offset(self, data_len):
         """get the data offset for the ness blocks
@@ -206,34 +241,49 @@ class IMFV283Parser(object):
             dictionary containing the required values for decoding the
             data packet.
         """
+        data = numpy.frombuffer(bytes(data), dtype=numpy.uint8)
+        headers = self._parse_goes_headers(data.reshape(1, -1))
+        return {
+            'day': headers['day'][0],
+            'minute': headers['minute'][0],
+            'offset': headers['offset'][0].tolist(),
+            'orient': headers['orient'][0],
+            'scale': headers['scale'][0].tolist()
+        }
+
+    def _parse_goes_headers(self, data):
+        """ parse goes data headers
+
+        Parameters
+        ----------
+        data : numpy.ndarray
+            array of uint8 with shape (messages, 126),
+            containing the goes data packets.
+        Returns
+        -------
+        dict
+            dictionary containing arrays of the required values for decoding
+            the data packets, one value per message.
+        """
+        data = data[:, 0:8].astype(numpy.int64)
         header = {}
 
         # day of year and minute of day are combined into 3 bytes
-        header['day'] = data[0] + 0x100 * (data[1] & 0xF)
-        header['minute'] = (data[2] & 0xFF) * 0x10 + data[1] / 0x10
+        header['day'] = data[:, 0] + 0x100 * (data[:, 1] & 0xF)
+        header['minute'] = data[:, 2] * 0x10 + data[:, 1] // 0x10
 
         # offset values for each channel are in bytes 3,4,5,6 respectively.
-        header['offset'] = data[3:7]
+        header['offset'] = data[:, 3:7]
 
         # Not used.  alert_capable = (goes_block[7] & 0x01)
         # orient code. The orientation of the instrument (HEZF, etc.)
-        header['orient'] = data[7] / 0x40
+        header['orient'] = data[:, 7] // 0x40
 
         # scale values bits 0,1,2,3 of byte 7.
         # Either 1 if bit not set, 2 if bit is set.
-        scale1 = 1
-        scale2 = 1
-        scale3 = 1
-        scale4 = 1
-        if (data[7] & 0x20) > 0:
-            scale1 = 2
-        if (data[7] & 0x10) > 0:
-            scale2 = 2
-        if (data[7] & 0x8) > 0:
-            scale3 = 2
-        if (data[7] & 0x4) > 0:
-            scale4 = 2
-        header['scale'] = [scale1, scale2, scale3, scale4]
+        scale_bits = numpy.array([0x20, 0x10, 0x8, 0x4])
+        header['scale'] = numpy.where(
+                (data[:, 7:8] & scale_bits) > 0, 2, 1)
 
         return header
 
@@ -262,46 +312,111 @@ class IMFV283Parser(object):
         header['data_len'] = int(msg[32:37])
         return header
 
-    def _post_process(self, data, msg_header, goes_header):
+    def _post_process(self, data, msg_headers, goes_headers,
+            starttime=None, endtime=None):
         """process parsed data
 
+        Messages are written into one array per observatory and channel,
+        spanning the time window, and added to ``self.stream``.
+        When messages overlap, values from the latest transmission are kept,
+        unless they are missing.
+
         Parameters
         ----------
-        data: dict
-            parsed data by channel
-        msg_header: dict
-            parsed header of the message
-        goes_header: dict
-            parsed header of the goes data
-
+        data: numpy.ndarray
+            parsed data with shape (messages, 4, 12).
+        msg_headers: list<dict>
+            parsed header of each message
+        goes_headers: dict
+            parsed header arrays of the goes data
+        starttime : obspy.core.UTCDateTime
+            time of first sample, optional.
+        endtime : obspy.core.UTCDateTime
+            time of last sample, optional.
         """
-        (goes_time, msg_time) = self._get_startime(msg_header, goes_header)
-        if (msg_time - goes_time) > (24 * 60):
+        goes_times = numpy.zeros(len(msg_headers))
+        msg_times = numpy.zeros(len(msg_headers))
+        known = numpy.zeros(len(msg_headers), dtype=bool)
+        for i, msg_header in enumerate(msg_headers):
+            goes_header = {
+                'day': goes_headers['day'][i],
+                'minute': goes_headers['minute'][i]
+            }
+            try:
+                (goes_time, msg_time) = self._get_startime(msg_header,
+                        goes_header)
+            except ValueError:
+                sys.stderr.write('Incorrect message time\n')
+                continue
+            goes_times[i] = goes_time.timestamp
+            msg_times[i] = msg_time.timestamp
+            known[i] = True
+        valid = known & ((msg_times - goes_times) <= (24 * 60))
+        if not numpy.all(valid[known]):
             sys.stderr.write('data over twice as old as the message')
+        if not numpy.any(valid):
             return
 
-        scale = goes_header['scale']
-        offset = goes_header['offset']
-        orientation = goes_header['orient']
-        for channel, loc in zip(CHANNELS[orientation], xrange(0, 4)):
-            stats = obspy.core.Stats()
-            stats.channel = channel
-            stats.sampling_rate = 0.0166666666667
-            stats.starttime = goes_time
-            stats.npts = 12
-            stats.station = msg_header['obs']
-
-            numpy_data = numpy.array(data[channel], dtype=numpy.float64)
-            numpy_data[numpy_data == DEAD_VALUE] = numpy.nan
-            # Data values need to be scaled, offset and shifted into the
-            # correct 10th nanotesla value.
-            # For our convenience we convert to nanotesla values.
-            numpy_data = numpy.multiply(numpy_data, scale[loc])
-            numpy_data = numpy.add(numpy_data, offset[loc] * BIAS - SHIFT)
-            numpy_data = numpy.divide(numpy_data, 10.0)
-
-            trace = obspy.core.Trace(numpy_data, stats)
-            self.stream += trace
+        # write latest transmissions last
+        order = numpy.argsort(msg_times, kind='mergesort')
+        stations = numpy.array([h['obs'] for h in msg_headers])
+        orient = goes_headers['orient']
+        for station in sorted(set(stations[valid])):
+            station_packets = valid & (stations == station)
+            # align window to minutes,
+            # defaults to the extent of this observatory's messages
+            if starttime is None:
+                start = goes_times[station_packets].min()
+            else:
+                start = math.ceil(starttime.timestamp / 60.) * 60
+            if endtime is None:
+                end = goes_times[station_packets].max() + 11 * 60
+            else:
+                end = math.floor(endtime.timestamp / 60.) * 60
+            if end < start:
+                continue
+            npts = int(round((end - start) / 60.)) + 1
+            # this observatory's messages, latest transmissions last
+            packets = order[station_packets[order]]
+            packet_orient = orient[packets]
+            # sample index of each value, relative to the window
+            index = numpy.round((goes_times[packets] - start) / 60.).astype(
+                    numpy.int64)
+            positions = (index[:, numpy.newaxis] + numpy.arange(12)).ravel()
+            # orientations can share channels, like Z and F,
+            # which are combined into one trace per channel
+            channels = []
+            sources = {}
+            for orientation in sorted(set(packet_orient)):
+                for channel, loc in zip(CHANNELS[orientation], xrange(0, 4)):
+                    if channel not in sources:
+                        channels.append(channel)
+                        sources[channel] = []
+                    sources[channel].append((orientation, loc))
+            for channel in channels:
+                # values from each message, NaN when message has no channel
+                values = numpy.full((len(packets), 12), numpy.nan)
+                for orientation, loc in sources[channel]:
+                    rows = packet_orient == orientation
+                    values[rows] = data[packets[rows], loc]
+                values = values.ravel()
+                keep = ~numpy.isnan(values) & \
+                        (positions >= 0) & (positions < npts)
+                values = values[keep]
+                channel_positions = positions[keep]
+                # keep the last value written at each position
+                channel_positions, last = numpy.unique(
+                        channel_positions[::-1], return_index=True)
+                channel_data = numpy.full(npts, numpy.nan)
+                channel_data[channel_positions] = values[::-1][last]
+
+                stats = obspy.core.Stats()
+                stats.channel = channel
+                stats.sampling_rate = 1 / 60.
+                stats.starttime = UTCDateTime(start)
+                stats.npts = npts
+                stats.station = station
+                self.stream += obspy.core.Trace(channel_data, stats)
 
     def _process_ness_block(self, msg, domsat, data_len):
         """process the "ness" block of data into an IMFV283 data block.
@@ -316,34 +431,46 @@ class IMFV283Parser(object):
         data_len : int
             data_len provided by the message header.
         """
-        goes_block = bytearray(126)
-        ness_byte = 0
-        goes_byte = 0
+        offset = self._get_data_offset(data_len)
+        ness = numpy.frombuffer(msg[offset:offset + NESS_BLOCK_SIZE],
+                dtype=numpy.uint8)
+        goes_block = self._process_ness_blocks(ness.reshape(1, 63, 3),
+                [domsat['swap_hdr']], [domsat['swap_data']])
+        return bytearray(goes_block[0].tostring())
 
-        if data_len == MSG_SIZE_300B:
-            offset = HEADER_SIZE + 1
-        else:
-            offset = HEADER_SIZE
-
-        for cnt in xrange(0, 63):
-            # Convert 3 byte "pair" into ordinal values for manipulation.
-            byte3 = ord(msg[offset + ness_byte + 2])
-            byte2 = ord(msg[offset + ness_byte + 1])
-            byte1 = ord(msg[offset + ness_byte])
-
-            goes_value1 = (byte3 & 0x3F) + ((byte2 & 0x3) * 0x40)
-            goes_value2 = ((byte2 / 0x4) & 0xF) + ((byte1 & 0xF) * 0x10)
-
-            # swap the bytes depending on domsat information.
-            if domsat['swap_hdr'] and cnt <= 11 or \
-                    domsat['swap_data'] and cnt > 11:
-                goes_block[goes_byte] = goes_value2
-                goes_block[goes_byte + 1] = goes_value1
-            else:
-                goes_block[goes_byte] = goes_value1
-                goes_block[goes_byte + 1] = goes_value2
+    def _process_ness_blocks(self, ness, swap_hdr, swap_data):
+        """process "ness" blocks of data into IMFV283 data blocks.
 
-            ness_byte += 3
-            goes_byte += 2
+        Parameters
+        ----------
+        ness : numpy.ndarray
+            array of uint8 with shape (messages, 63, 3),
+            the ness block of each message.
+        swap_hdr : array_like
+            whether to swap header bytes, one value per message.
+        swap_data : array_like
+            whether to swap data bytes, one value per message.
 
-        return goes_block
+        Returns
+        -------
+        numpy.ndarray
+            array of uint8 with shape (messages, 126),
+            the IMFV283 data block of each message.
+        """
+        byte1 = ness[:, :, 0]
+        byte2 = ness[:, :, 1]
+        byte3 = ness[:, :, 2]
+
+        goes_value1 = (byte3 & 0x3F) + ((byte2 & 0x3) * 0x40)
+        goes_value2 = ((byte2 // 0x4) & 0xF) + ((byte1 & 0xF) * 0x10)
+
+        # swap the bytes depending on domsat information,
+        # the first 12 pairs are header, the rest are data.
+        swap = numpy.empty(byte1.shape, dtype=bool)
+        swap[:, :12] = numpy.asarray(swap_hdr, dtype=bool)[:, numpy.newaxis]
+        swap[:, 12:] = numpy.asarray(swap_data, dtype=bool)[:, numpy.newaxis]
+
+        goes_block = numpy.empty(byte1.shape + (2,), dtype=numpy.uint8)
+        goes_block[:, :, 0] = numpy.where(swap, goes_value2, goes_value1)
+        goes_block[:, :, 1] = numpy.where(swap, goes_value1, goes_value2)
+        return goes_block.reshape(len(ness), -1)
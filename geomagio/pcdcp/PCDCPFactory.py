@@ -3,7 +3,7 @@
 import obspy.core
 from .. import ChannelConverter
 from ..TimeseriesFactory import TimeseriesFactory
-from PCDCPParser import PCDCPParser
+from PCDCPParser import PCDCPParser, SECOND_RESOLUTION
 from PCDCPWriter import PCDCPWriter
 
 
@@ -33,16 +33,22 @@ class PCDCPFactory(TimeseriesFactory):
     PCDCPParser
     """
 
+    # parser works directly on mapped files
+    parse_buffers = True
+
     def __init__(self, **kwargs):
         TimeseriesFactory.__init__(self, **kwargs)
 
-    def parse_string(self, data, **kwargs):
+    def parse_string(self, data, channels=None, **kwargs):
         """Parse the contents of a string in the format of a pcdcp file.
 
         Parameters
         ----------
-        data : str
+        data : str or buffer
             String containing PCDCP content.
+        channels : array_like
+            channels to parse, optional.
+            parses all channels if unspecified.
 
         Returns
         -------
@@ -50,26 +56,20 @@ class PCDCPFactory(TimeseriesFactory):
             Parsed data.
         """
         parser = PCDCPParser()
-        parser.parse(data)
+        parser.parse(data, channels=channels)
 
-        yr = int(parser.header['year'])
-        yrday = int(parser.header['yearday'])
-
-        begin = int(parser.times[0])
-        startHour = int(begin / 60.0)
-        startMinute = int(begin % 60.0)
-        ending = int(parser.times[-1])
-        endHour = int(ending / 60.0)
-        endMinute = int(ending % 60.0)
+        data = parser.data
+        if len(parser.times) == 0 or len(data) == 0:
+            return obspy.core.Stream()
 
-        starttime = obspy.core.UTCDateTime(year=yr, julday=yrday,
-                        hour=startHour, minute=startMinute)
-        endtime = obspy.core.UTCDateTime(year=yr, julday=yrday, hour=endHour,
-                        minute=endMinute)
+        starttime = self._get_time(parser, parser.times[0])
+        endtime = self._get_time(parser, parser.times[-1])
 
-        data = parser.data
         length = len(data[data.keys()[0]])
-        rate = (length - 1) / (endtime - starttime)
+        if length > 1:
+            rate = (length - 1) / (endtime - starttime)
+        else:
+            rate = 1.0 / self._get_delta(parser)
         stream = obspy.core.Stream()
 
         for channel in data.keys():
@@ -89,6 +89,76 @@ class PCDCPFactory(TimeseriesFactory):
 
         return stream
 
+    def parse_inventory(self, head, tail, type=None, **kwargs):
+        """Parse inventory from the beginning and end of a PCDCP file.
+
+        Parameters
+        ----------
+        head : str
+            beginning of PCDCP content.
+        tail : str
+            end of PCDCP content.
+        type : str
+            data type, which is not included in PCDCP headers.
+
+        Returns
+        -------
+        dict
+            inventory, see ``TimeseriesFactory.parse_inventory``.
+        """
+        parser = PCDCPParser()
+        if not parser.parse_inventory(head, tail):
+            return None
+        interval = 'minute'
+        if self._get_delta(parser) == 1:
+            interval = 'second'
+        return {
+            'station': parser.header['station'],
+            'channels': parser.channels,
+            'type': type,
+            'interval': interval,
+            'starttime': self._get_time(parser, parser.times[0]),
+            'endtime': self._get_time(parser, parser.times[-1])
+        }
+
+    def _get_delta(self, parser):
+        """Get the number of seconds between samples.
+
+        Parameters
+        ----------
+        parser : PCDCPParser
+            parser with parsed header.
+
+        Returns
+        -------
+        int
+            1 for 1-second files, 60 for 1-minute files.
+        """
+        if parser.header['resolution'] == SECOND_RESOLUTION:
+            return 1
+        return 60
+
+    def _get_time(self, parser, time):
+        """Convert a parsed time to a UTCDateTime.
+
+        Parameters
+        ----------
+        parser : PCDCPParser
+            parser with parsed header.
+        time : int
+            minute of day for 1-minute files,
+            or second of day for 1-second files.
+
+        Returns
+        -------
+        obspy.core.UTCDateTime
+            time of sample.
+        """
+        day = obspy.core.UTCDateTime(
+                year=int(parser.header['year']),
+                julday=int(parser.header['yearday']))
+        return day + int(time) * self._get_delta(parser)
+
     def write_file(self, fh, timeseries, channels):
         """writes timeseries data to the given file object.
 
@@ -101,3 +171,29 @@ class PCDCPFactory(TimeseriesFactory):
             list of channels to store
         """
         PCDCPWriter().write(fh, timeseries, channels)
+
+    def write_file_header(self, fh, timeseries, channels):
+        """writes file headers to the given file object.
+
+        Parameters
+        ----------
+        fh: file object
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : array_like
+            list of channels to store
+        """
+        PCDCPWriter().write_header(fh, timeseries, channels)
+
+    def write_file_data(self, fh, timeseries, channels):
+        """writes fixed width data lines to the given file object.
+
+        Parameters
+        ----------
+        fh: file object
+        timeseries : obspy.core.Stream
+            stream containing traces to store.
+        channels : array_like
+            list of channels to store
+        """
+        PCDCPWriter().write_data(fh, timeseries, channels)
@@ -2,12 +2,16 @@
 
 
 import numpy
+from ..Util import get_fixed_width_column, get_fixed_width_rows
 
 # values that represent missing data points in PCDCP
 NINES = numpy.int('9999999')
 NINES_RAW = numpy.int('99999990')
 NINES_DEG = numpy.int('9999')
 
+# header resolution of 1-second files
+SECOND_RESOLUTION = '0.001nT'
+
 
 class PCDCPParser(object):
     """PCDCP parser.
@@ -19,7 +23,8 @@ class PCDCPParser(object):
     channels : array
         parsed channel names.
     times : array
-        parsed timeseries times.
+        parsed timeseries times, as minute of day for 1-minute files,
+        or second of day for 1-second files.
     data : dict
         keys are channel names (order listed in ``self.channels``).
         values are ``numpy.array`` of timeseries values, array values are
@@ -39,25 +44,57 @@ class PCDCPParser(object):
         # temporary storage for data being parsed
         self._parsedata = None
 
-    def parse(self, data):
+    def parse(self, data, channels=None):
         """Parse a string containing PCDCP formatted data.
 
         Parameters
         ----------
-        data : str
+        data : str or buffer
             PCDCP formatted file contents.
+        channels : array_like
+            channels to parse, optional.
+            parses all channels if unspecified.
         """
         self._set_channels()
 
-        parsing_header = True
-        lines = data.splitlines()
-        for line in lines:
-            if parsing_header:
-                self._parse_header(line)
-                parsing_header = False
-            else:
-                self._parse_data(line)
-        self._post_process()
+        end = data.find('\n')
+        if end == -1:
+            end = len(data)
+        self._parse_header(data[:end].rstrip('\r'))
+        self._parse_data_block(data, end + 1, channels)
+        self._post_process(channels)
+
+    def parse_inventory(self, head, tail):
+        """Parse header, and times of the first and last data lines.
+
+        Parameters
+        ----------
+        head : str
+            beginning of PCDCP formatted file contents,
+            including header and first data line.
+        tail : str
+            end of PCDCP formatted file contents,
+            including last data line.
+
+        Returns
+        -------
+        bool
+            True if header and data line times were parsed,
+            and ``self.times`` contains the first and last time.
+            False if ``head`` or ``tail`` were incomplete.
+        """
+        # last line of head may be incomplete
+        lines = head.split('\n')[:-1]
+        if len(lines) < 2:
+            return False
+        self._set_channels()
+        self._parse_header(lines[0].rstrip('\r'))
+        first = lines[1].split()
+        last = tail.rstrip().rsplit('\n', 1)[-1].split()
+        if len(first) != 5 or len(last) != 5:
+            return False
+        self.times = [int(first[0]), int(last[0])]
+        return True
 
     def _parse_header(self, line):
         """Parse header line.
@@ -69,9 +106,84 @@ class PCDCPParser(object):
         self.header['year'] = line[5:9]
         self.header['yearday'] = line[11:14]
         self.header['date'] = line[16:25]
+        self.header['resolution'] = line[33:40].strip()
 
         return
 
+    def _parse_data_block(self, data, offset, channels=None):
+        """Parse all data lines at once.
+
+        Data lines are fixed width, and only the requested channel columns
+        are decoded, as columns of a 2 dimensional byte array.
+        Falls back to ``_parse_data`` for each line when lines are not
+        all the same width.
+
+        Parameters
+        ----------
+        data : str
+            PCDCP formatted file contents.
+        offset : int
+            position of the first data line in ``data``.
+        channels : array_like
+            channels to parse, optional.
+            parses all channels if unspecified.
+        """
+        rows = get_fixed_width_rows(data, offset)
+        if rows is not None:
+            try:
+                self._parsedata = self._parse_data_rows(rows, channels)
+                return
+            except ValueError:
+                # fall back to parsing one line at a time
+                pass
+        for line in data[offset:].splitlines():
+            self._parse_data(line)
+
+    def _parse_data_rows(self, rows, channels=None):
+        """Decode fixed width data lines.
+
+        1-minute lines have a 4 digit time and 8 character values,
+        1-second lines have a 5 digit time and 9 character values.
+
+        Parameters
+        ----------
+        rows : numpy.ndarray
+            2 dimensional array of bytes, one row per data line.
+        channels : array_like
+            channels to decode, optional.
+            decodes all channels if unspecified.
+
+        Returns
+        -------
+        tuple
+            parsed times, followed by one array of values per channel
+            (None for channels that were not requested).
+
+        Raises
+        ------
+        ValueError
+            if rows are not the expected width,
+            or any value cannot be decoded.
+        """
+        time_width = 4
+        value_width = 8
+        if self.header.get('resolution') == SECOND_RESOLUTION:
+            time_width = 5
+            value_width = 9
+        # width of all columns, plus line ending
+        width = time_width + len(self.channels) * (value_width + 1)
+        if rows.shape[1] - width not in (1, 2):
+            raise ValueError('unexpected line width')
+        parsedata = [get_fixed_width_column(rows, 0, time_width, numpy.int64)]
+        for i, channel in enumerate(self.channels):
+            if channels is not None and channel not in channels:
+                parsedata.append(None)
+                continue
+            start = time_width + 1 + i * (value_width + 1)
+            parsedata.append(get_fixed_width_column(rows, start,
+                    start + value_width))
+        return tuple(parsedata)
+
     def _parse_data(self, line):
         """Parse one data point in the timeseries.
 
@@ -79,26 +191,41 @@ class PCDCPParser(object):
         Adds channel values to ``self.data``.
         """
         t, d1, d2, d3, d4 = self._parsedata
+        time, v1, v2, v3, v4 = line.split()
 
-        t.append(line[0:4])
-        d1.append(int(line[5:13]))
-        d2.append(int(line[14:22]))
-        d3.append(int(line[23:31]))
-        d4.append(int(line[32:40]))
+        t.append(int(time))
+        d1.append(int(v1))
+        d2.append(int(v2))
+        d3.append(int(v3))
+        d4.append(int(v4))
 
-    def _post_process(self):
+    def _post_process(self, channels=None):
         """Post processing after data is parsed.
 
         Converts data to numpy arrays.
-        Replaces empty values with ``numpy.nan``.
+        Replaces empty values with ``numpy.nan``, and scales values to nT,
+        in place.
+
+        Parameters
+        ----------
+        channels : array_like
+            channels to process, optional.
+            processes all channels if unspecified.
         """
         self.times = self._parsedata[0]
 
+        empty_value = NINES
+        scale = 100
+        if self.header.get('resolution') == SECOND_RESOLUTION:
+            empty_value = NINES_RAW
+            scale = 1000
         for channel, data in zip(self.channels, self._parsedata[1:]):
-            data = numpy.array(data, dtype=numpy.float64)
+            if channels is not None and channel not in channels:
+                continue
+            data = numpy.asarray(data, dtype=numpy.float64)
             # filter empty values
-            data[data == NINES] = numpy.nan
-            data = numpy.divide(data, 100)
+            data[data == empty_value] = numpy.nan
+            numpy.divide(data, scale, out=data)
             self.data[channel] = data
 
         self._parsedata = None
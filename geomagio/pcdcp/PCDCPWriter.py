@@ -1,19 +1,24 @@
 
+import itertools
 import numpy
 import PCDCPParser
 from cStringIO import StringIO
-from datetime import datetime
-from .. import ChannelConverter, TimeseriesUtility
+from .. import TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
+
+# number of data lines formatted and written at a time
+BLOCK_SIZE = 1440
 
 
 class PCDCPWriter(object):
     """PCDCP writer.
     """
 
-    def __init__(self, empty_value=PCDCPParser.NINES):
+    def __init__(self, empty_value=PCDCPParser.NINES, block_size=BLOCK_SIZE):
         self.empty_value = empty_value
+        self.block_size = block_size
+        # scratch array reused for each block of output values
+        self._values = None
 
     def write(self, out, timeseries, channels):
         """Write timeseries to pcdcp file.
@@ -27,20 +32,70 @@ class PCDCPWriter(object):
             channels : array_like
                 Channels to be written from timeseries object.
         """
-        for channel in channels:
-            if timeseries.select(channel=channel).count() == 0:
-                raise TimeseriesFactoryException(
-                    'Missing channel "%s" for output, available channels %s' %
-                    (channel, str(TimeseriesUtility.get_channels(timeseries))))
+        self.write_header(out, timeseries, channels)
+        self.write_data(out, timeseries, channels)
+
+    def write_header(self, out, timeseries, channels):
+        """Write pcdcp header line.
+
+        Parameters
+        ----------
+            out : file object
+                File object to be written to. Could be stdout.
+            timeseries : obspy.core.stream
+                Timeseries object with metadata to be written.
+            channels : array_like
+                Channels to be written from timeseries object.
+        """
+        self._check_channels(timeseries, channels)
+        out.write(self._format_header(timeseries[0].stats))
+
+    def write_data(self, out, timeseries, channels):
+        """Write pcdcp data lines.
+
+        Every data line has the same width.
+
+        Parameters
+        ----------
+            out : file object
+                File object to be written to. Could be stdout.
+            timeseries : obspy.core.stream
+                Timeseries object with data to be written.
+            channels : array_like
+                Channels to be written from timeseries object.
+        """
+        self._check_channels(timeseries, channels)
         stats = timeseries[0].stats
 
         # Set dead val for 1-sec data.
         if stats.delta == 1:
             self.empty_value = PCDCPParser.NINES_RAW
 
-        out.write(self._format_header(stats))
+        count = len(timeseries.select(channel=channels[0])[0].data)
+        for start in xrange(0, count, self.block_size):
+            out.write(self._format_data(timeseries, channels, stats,
+                    start, start + self.block_size))
+
+    def _check_channels(self, timeseries, channels):
+        """Check that channels exist for output.
+
+        Parameters
+        ----------
+            timeseries : obspy.core.stream
+                Timeseries object with data to be written.
+            channels : array_like
+                Channels to be written from timeseries object.
 
-        out.write(self._format_data(timeseries, channels, stats))
+        Raises
+        ------
+        TimeseriesFactoryException
+            If any channel is missing from timeseries.
+        """
+        for channel in channels:
+            if timeseries.select(channel=channel).count() == 0:
+                raise TimeseriesFactoryException(
+                    'Missing channel "%s" for output, available channels %s' %
+                    (channel, str(TimeseriesUtility.get_channels(timeseries))))
 
     def _format_header(self, stats):
         """format headers for PCDCP file
@@ -72,8 +127,9 @@ class PCDCPWriter(object):
 
         return ''.join(buf)
 
-    def _format_data(self, timeseries, channels, stats):
-        """Format all data lines.
+    def _format_data(self, timeseries, channels, stats, start=0,
+            end=None):
+        """Format data lines.
 
         Parameters
         ----------
@@ -81,83 +137,102 @@ class PCDCPWriter(object):
                 Stream containing traces with channel listed in channels
             channels : sequence
                 List and order of channel values to output.
+            start : int
+                Index of first sample to format.
+            end : int
+                Index after last sample to format, optional.
+                Formats all remaining samples if unspecified.
 
         Returns
         -------
         str
             A string formatted to be the data lines in a PCDCP file.
         """
-        buf = []
-
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
-            if traceLocal.stats.channel == 'D':
-                traceLocal.data = \
-                    ChannelConverter.get_minutes_from_radians(traceLocal.data)
-
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
-
-            timeseriesLocal.append(traceLocal)
-
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
+        # 1-sec and 1-min data have different formats.
+        # Won't work if input is IAGA2002: stats missing data_interval.
+        data_multiplier = 100
+        if stats.delta == 1:
+            data_multiplier = 1000
 
-        for i in xrange(len(traces[0].data)):
-            buf.append(self._format_values(
-                datetime.utcfromtimestamp(starttime + i * delta),
-                (t.data[i] for t in traces), stats))
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        count = len(traces[0].data)
+        if end is None or end > count:
+            end = count
+        if end <= start:
+            return ''
+        values = TimeseriesUtility.get_output_values(traces, start, end,
+                self._values, convert_d=True)
+        self._values = values
+        values = self._scale_values(values, data_multiplier)
+        times = TimeseriesUtility.get_sample_times(traces[0], start, end)
+        return self._format_values(times, values.T, stats)
+
+    def _scale_values(self, data, multiplier):
+        """Scale data values to PCDCP integers.
 
-        return ''.join(buf)
+        Parameters
+        ----------
+            data : numpy.ndarray
+                Array of float values.
+            multiplier : int
+                Number of PCDCP units per data unit.
 
-    def _format_values(self, time, values, stats):
-        """Format one line of data values.
+        Returns
+        -------
+        numpy.ndarray
+            Array of int values, rounded half away from zero.
+            NaN values are replaced with self.empty_value.
+        """
+        scaled = data * multiplier
+        # replace NaN before comparing, which would warn about NaN values
+        empty = numpy.isnan(scaled)
+        scaled[empty] = 0
+        scaled = numpy.where(scaled >= 0,
+                numpy.floor(scaled + 0.5),
+                numpy.ceil(scaled - 0.5))
+        scaled = scaled.astype(numpy.int64)
+        scaled[empty] = self.empty_value
+        return scaled
+
+    def _format_values(self, times, values, stats):
+        """Format data lines.
 
         Parameters
         ----------
-            time : datetime
-                Timestamp for values.
-            values : sequence
-                List and order of channel values to output.
-                If value is NaN, self.empty_value is output in its place.
+            times : numpy.ndarray
+                Array of numpy.datetime64, timestamp for each line.
+            values : numpy.ndarray
+                2 dimensional array of scaled int values,
+                with one row per line and one column per channel.
+                Values should already use self.empty_value in place of NaN.
 
         Returns
         -------
-        unicode
-            Formatted line containing values.
+        str
+            Formatted lines containing values.
         """
         # 1-sec and 1-min data have different formats.
         # Won't work if input is IAGA2002: stats missing data_interval.
         time_width = 4
         data_width = 8
-        data_multiplier = 100
-        hr_multiplier = 60
-        mn_multiplier = 1
-        sc_multiplier = 0
+        time_divisor = 60
         if stats.delta == 1:
             time_width = 5
             data_width = 9
-            data_multiplier = 1000
-            hr_multiplier = 3600
-            mn_multiplier = 60
-            sc_multiplier = 1
-
-        tt = time.timetuple()
-
-        totalMinutes = int(tt.tm_hour * hr_multiplier +
-                        tt.tm_min * mn_multiplier + tt.tm_sec * sc_multiplier)
-
-        return '{0:0>{tw}d} {1: >{dw}d} {2: >{dw}d} {3: >{dw}d}' \
-                ' {4: >{dw}d}\n'.format(totalMinutes, tw=time_width,
-                *[self.empty_value if numpy.isnan(val) else int(round(
-                    val * data_multiplier))
-                        for val in values], dw=data_width)
+            time_divisor = 1
+
+        count = len(times)
+        if count == 0:
+            return ''
+        # minute of day for 1-min data, second of day for 1-sec data
+        seconds = times.astype('datetime64[s]')
+        offsets = (seconds - seconds.astype('datetime64[D]')).astype(
+                numpy.int64) // time_divisor
+        columns = [offsets.tolist()]
+        columns.extend(values.T.tolist())
+        line = '%0{0}d'.format(time_width) + \
+                ' %{0}d'.format(data_width) * len(values[0]) + '\n'
+        return (line * count) % tuple(itertools.chain(*zip(*columns)))
 
     @classmethod
     def format(self, timeseries, channels):
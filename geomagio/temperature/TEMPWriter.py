@@ -1,18 +1,22 @@
 
 import numpy
 from cStringIO import StringIO
-from datetime import datetime
 from .. import TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
-from obspy.core import Stream
+
+# number of data lines formatted and written at a time
+BLOCK_SIZE = 1440
 
 
 class TEMPWriter(object):
     """TEMP writer.
     """
 
-    def __init__(self, empty_value=numpy.int('9999')):
+    def __init__(self, empty_value=numpy.int('9999'), block_size=BLOCK_SIZE):
         self.empty_value = empty_value
+        self.block_size = block_size
+        # scratch array reused for each block of output values
+        self._values = None
 
     def write(self, out, timeseries, channels):
         """Write timeseries to temp/volt file.
@@ -33,7 +37,10 @@ class TEMPWriter(object):
                     (channel, str(TimeseriesUtility.get_channels(timeseries))))
         stats = timeseries[0].stats
         out.write(self._format_header(stats))
-        out.write(self._format_data(timeseries, channels))
+        count = len(timeseries.select(channel=channels[0])[0].data)
+        for start in xrange(0, count, self.block_size):
+            out.write(self._format_data(timeseries, channels,
+                    start, start + self.block_size))
 
     def _format_header(self, stats):
         """format headers for temp/volt file
@@ -60,8 +67,9 @@ class TEMPWriter(object):
 
         return ''.join(buf)
 
-    def _format_data(self, timeseries, channels):
-        """Format all data lines.
+    def _format_data(self, timeseries, channels, start=0,
+            end=None):
+        """Format data lines.
 
         Parameters
         ----------
@@ -69,6 +77,11 @@ class TEMPWriter(object):
                 Stream containing traces with channel listed in channels
             channels : sequence
                 List and order of channel values to output.
+            start : int
+                Index of first sample to format.
+            end : int
+                Index after last sample to format, optional.
+                Formats all remaining samples if unspecified.
 
         Returns
         -------
@@ -77,27 +90,18 @@ class TEMPWriter(object):
         """
         buf = []
 
-        # create new stream
-        timeseriesLocal = Stream()
-        # Use a copy of the trace so that we don't modify the original.
-        for trace in timeseries:
-            traceLocal = trace.copy()
-
-            # TODO - we should look into multiplying the trace all at once
-            # like this, but this gives an error on Windows at the moment.
-            # traceLocal.data = \
-            #     numpy.round(numpy.multiply(traceLocal.data, 100)).astype(int)
-
-            timeseriesLocal.append(traceLocal)
-
-        traces = [timeseriesLocal.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
+        traces = [timeseries.select(channel=c)[0] for c in channels]
+        count = len(traces[0].data)
+        if end is None or end > count:
+            end = count
+        values = TimeseriesUtility.get_output_values(traces, start, end,
+                self._values)
+        self._values = values
+        times = TimeseriesUtility.get_sample_times(traces[0], start, end)
 
-        for i in xrange(len(traces[0].data)):
+        for i, time in enumerate(times.tolist()):
             buf.append(self._format_values(
-                datetime.utcfromtimestamp(starttime + i * delta),
-                (t.data[i] for t in traces)))
+                time, (data[i] for data in values)))
 
         return ''.join(buf)
 
@@ -0,0 +1,75 @@
+"""Tests for MissingUrlCache."""
+import os
+import shutil
+import tempfile
+import time
+from nose.tools import assert_equals, assert_false, assert_true
+from geomagio import MissingUrlCache, TimeseriesFactory
+from obspy.core import UTCDateTime
+
+
+def test_is_missing():
+    """MissingUrlCache_test.test_is_missing()
+    """
+    cache = MissingUrlCache(recent_ttl=60, historical_ttl=3600)
+    recent = UTCDateTime()
+    historical = UTCDateTime('2000-01-01T00:00:00Z')
+    assert_false(cache.is_missing('file:///recent'))
+    cache.add('file:///recent', recent)
+    cache.add('file:///historical', historical)
+    assert_true(cache.is_missing('file:///recent'))
+    assert_true(cache.is_missing('file:///historical'))
+    assert_equals(cache.skipped, 2)
+    # recent urls expire sooner
+    for missing in cache._missing.values():
+        missing['checked'] -= 120
+    assert_false(cache.is_missing('file:///recent'))
+    assert_true(cache.is_missing('file:///historical'))
+    cache.remove('file:///historical')
+    assert_false(cache.is_missing('file:///historical'))
+    assert_equals(cache.skipped, 3)
+
+
+def test_save():
+    """MissingUrlCache_test.test_save()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'missing.json')
+        cache = MissingUrlCache(filename=filename)
+        cache.add('file:///missing', UTCDateTime(time.time()))
+        assert_true(MissingUrlCache(filename=filename).is_missing(
+                'file:///missing'))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_add__prune():
+    """MissingUrlCache_test.test_add__prune()
+    """
+    cache = MissingUrlCache(recent_ttl=60, historical_ttl=3600)
+    cache.add('file:///expired', UTCDateTime())
+    cache._missing['file:///expired']['checked'] -= 120
+    cache.add('file:///missing', UTCDateTime())
+    # expired urls are removed when urls are added
+    assert_equals(cache._missing.keys(), ['file:///missing'])
+
+
+def test_read_url__not_found():
+    """MissingUrlCache_test.test_read_url__not_found()
+
+    Make sure only urls that do not exist are cached by factories.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        cache = MissingUrlCache()
+        factory = TimeseriesFactory(missingUrlCache=cache)
+        missing = 'file://' + os.path.join(directory, 'missing.min')
+        assert_equals(factory._read_url((missing, UTCDateTime())), None)
+        assert_true(cache.is_missing(missing))
+        # directories exist, but cannot be read
+        unreadable = 'file://' + directory
+        assert_equals(factory._read_url((unreadable, UTCDateTime())), None)
+        assert_false(cache.is_missing(unreadable))
+    finally:
+        shutil.rmtree(directory)
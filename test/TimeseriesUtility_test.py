@@ -1,8 +1,9 @@
 #! /usr/bin/env python
+from datetime import datetime
 from nose.tools import assert_equals
 from StreamConverter_test import __create_trace
 import numpy
-from geomagio import TimeseriesUtility
+from geomagio import ChannelConverter, TimeseriesUtility
 from obspy.core import Stream, UTCDateTime
 
 
@@ -90,3 +91,40 @@ def test_get_merged_gaps():
     gap = merged[1]
     assert_equals(gap[0], UTCDateTime('2015-01-01T00:00:05Z'))
     assert_equals(gap[1], UTCDateTime('2015-01-01T00:00:07Z'))
+
+
+def test_get_sample_times():
+    """TimeseriesUtility_test.test_get_sample_times()
+
+    confirms sample times match datetime.utcfromtimestamp
+    """
+    trace = __create_trace('H', [1, 2, 3, 4, 5])
+    trace.stats.starttime = UTCDateTime('2015-01-01T00:00:00.123456Z')
+    trace.stats.delta = 1 / 3.
+    times = TimeseriesUtility.get_sample_times(trace, start=1)
+    starttime = float(trace.stats.starttime)
+    expected = [datetime.utcfromtimestamp(starttime + i * trace.stats.delta)
+            for i in range(1, 5)]
+    assert_equals(times.tolist(), expected)
+
+
+def test_get_output_values():
+    """TimeseriesUtility_test.test_get_output_values()
+
+    confirms D is converted to minutes when requested,
+    and traces are not modified
+    """
+    h = __create_trace('H', [1, 2, 3, 4])
+    d = __create_trace('D', [0.01, 0.02, 0.03, 0.04])
+    values = TimeseriesUtility.get_output_values([h, d], 1, 3)
+    assert_equals(values[1].tolist(), [0.02, 0.03])
+    values = TimeseriesUtility.get_output_values([h, d], 1, 3,
+            convert_d=True)
+    assert_equals(values.shape, (2, 2))
+    assert_equals(values[0].tolist(), [2, 3])
+    assert_equals(values[1].tolist(),
+            (d.data[1:3] * ChannelConverter.R2M).tolist())
+    assert_equals(d.data.tolist(), [0.01, 0.02, 0.03, 0.04])
+    # scratch array is reused when large enough
+    reused = TimeseriesUtility.get_output_values([h, d], 2, 3, values)
+    assert_equals(numpy.may_share_memory(reused, values), True)
@@ -0,0 +1,72 @@
+"""Tests for UrlCache."""
+import os
+import shutil
+import tempfile
+import time
+from nose.tools import assert_equals, assert_false, assert_true
+from geomagio import UrlCache
+
+
+def test_put_get():
+    """UrlCache_test.test_put_get()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        cache = UrlCache(directory)
+        assert_equals(cache.get('http://server/a'), None)
+        cache.put('http://server/a', 'content', {
+            'etag': '"abc"',
+            'last-modified': 'Thu, 01 Jan 2015 00:00:00 GMT'
+        })
+        metadata = cache.get('http://server/a')
+        assert_equals(metadata['size'], 7)
+        assert_equals(cache.get_content('http://server/a'), 'content')
+        assert_equals(cache.get_request_headers(metadata), [
+            'If-None-Match: "abc"',
+            'If-Modified-Since: Thu, 01 Jan 2015 00:00:00 GMT'
+        ])
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_is_fresh():
+    """UrlCache_test.test_is_fresh()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        cache = UrlCache(directory, ttl=60,
+                ttls=[('http://server/definitive/*', None)])
+        cache.put('http://server/variation/a', 'a', {})
+        cache.put('http://server/definitive/b', 'b', {})
+        metadata = cache.get('http://server/variation/a')
+        assert_true(cache.is_fresh(metadata))
+        metadata['validated'] -= 120
+        assert_false(cache.is_fresh(metadata))
+        # revalidated contents are fresh again
+        cache.revalidated('http://server/variation/a', metadata, {})
+        assert_true(cache.is_fresh(cache.get('http://server/variation/a')))
+        metadata = cache.get('http://server/definitive/b')
+        metadata['validated'] -= 120
+        assert_true(cache.is_fresh(metadata))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_evict():
+    """UrlCache_test.test_evict()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        cache = UrlCache(directory, max_size=10)
+        cache.put('http://server/a', '0123', {})
+        cache.put('http://server/b', '0123', {})
+        # use a, so b is least recently used
+        past = time.time() - 60
+        os.utime(cache._get_path('http://server/b') + '.json', (past, past))
+        cache.get_content('http://server/a')
+        cache.put('http://server/c', '0123', {})
+        assert_equals(cache.get('http://server/b'), None)
+        assert_equals(cache.get_content('http://server/a'), '0123')
+        assert_equals(cache.get_content('http://server/c'), '0123')
+    finally:
+        shutil.rmtree(directory)
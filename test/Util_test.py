@@ -1,8 +1,14 @@
 #! /usr/bin/env python
+import BaseHTTPServer
+import errno
+import gzip
 import os.path
 import shutil
+import SocketServer
+import tempfile
+import threading
 from nose.tools import assert_equals, assert_false
-from geomagio import Util
+from geomagio import Util, UrlCache
 from obspy.core import UTCDateTime
 
 
@@ -64,3 +70,165 @@ def test_get_interval__trim():
     endtime = UTCDateTime('2015-01-02T00:00:00Z')
     intervals = Util.get_intervals(starttime, endtime, trim=True)
     assert_equals(intervals[0]['start'], starttime)
+
+
+def test_read_file_head_tail():
+    """Util_test.test_read_file_head_tail()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        filepath = os.path.join(directory, 'somefile')
+        with open(filepath, 'w') as f:
+            f.write('0123456789')
+        assert_equals(Util.read_file_head_tail(filepath, size=4),
+                ('0123', '6789'))
+        assert_equals(Util.read_url_head_tail('file://' + filepath, size=20),
+                ('0123456789', '0123456789'))
+    finally:
+        shutil.rmtree(directory)
+
+
+class _CountingHTTPServer(SocketServer.ThreadingMixIn,
+        BaseHTTPServer.HTTPServer):
+    """Local HTTP server that counts connections."""
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        return SocketServer.ThreadingMixIn.process_request(self,
+                request, client_address)
+
+
+class _KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Respond to every request with the same content, using keep-alive."""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        content = 'content of ' + self.path
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_read_url__reuses_connections():
+    """Util_test.test_read_url__reuses_connections()
+    """
+    server = _CountingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    pool = Util.CurlPool(size=1)
+    try:
+        url = 'http://127.0.0.1:%d/' % server.server_address[1]
+        for day in range(3):
+            assert_equals(Util.read_url(url + str(day), pool=pool),
+                    'content of /' + str(day))
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+    # one connection for all three requests
+    assert_equals(server.connections, 1)
+
+
+class _StatusHandler(_KeepAliveHandler):
+    """Respond with the status code in the request path."""
+
+    def do_GET(self):
+        content = 'error page'
+        self.send_response(int(self.path[1:]))
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def test_read_url__error_status():
+    """Util_test.test_read_url__error_status()
+    """
+    server = _CountingHTTPServer(('127.0.0.1', 0), _StatusHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    directory = tempfile.mkdtemp()
+    pool = Util.CurlPool(size=1)
+    try:
+        cache = UrlCache(directory)
+        url = 'http://127.0.0.1:%d/' % server.server_address[1]
+        errors = {}
+        for code in (403, 404, 500, 503):
+            try:
+                Util.read_url(url + str(code), cache=cache, pool=pool)
+            except IOError as e:
+                errors[code] = e.errno
+            # error pages are not cached
+            assert_equals(cache.get(url + str(code)), None)
+    finally:
+        shutil.rmtree(directory)
+        pool.close()
+        server.shutdown()
+        server.server_close()
+    assert_equals(errors, {403: None, 404: errno.ENOENT, 500: None,
+            503: None})
+
+
+def test_read_file__compressed():
+    """Util_test.test_read_file__compressed()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        content = ''.join('line %d\n' % i for i in range(1000))
+        for extension in ('.bz2', '.gz'):
+            filepath = os.path.join(directory, 'somefile' + extension)
+            with Util.open_file(filepath, 'wb') as f:
+                f.write(content)
+            assert_equals(Util.get_compression(filepath), extension[1:]
+                    .replace('gz', 'gzip'))
+            assert_equals(Util.read_file(filepath), content)
+            assert_equals(Util.read_url('file://' + filepath), content)
+            assert_equals(Util.read_file_head_tail(filepath, size=7),
+                    ('line 0\n', 'ne 999\n'))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_read_file__concatenated():
+    """Util_test.test_read_file__concatenated()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        filepath = os.path.join(directory, 'somefile.gz')
+        content = ''
+        for member in range(3):
+            # appending adds a gzip member
+            with gzip.open(filepath, 'ab') as f:
+                f.write('member %d\n' % member)
+            content += 'member %d\n' % member
+        assert_equals(Util.read_file(filepath), content)
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_map_file():
+    """Util_test.test_map_file()
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        filepath = os.path.join(directory, 'somefile')
+        with open(filepath, 'w') as f:
+            f.write('line 1\nline 2\n')
+        data = Util.read_url('file://' + filepath, buffer=True)
+        assert_equals(len(data), 14)
+        assert_equals(data.find('\n', 7), 13)
+        assert_equals(data[7:13], 'line 2')
+        rows = Util.get_fixed_width_rows(data)
+        assert_equals(rows.shape, (2, 7))
+        # empty files cannot be mapped
+        open(filepath, 'w').close()
+        assert_equals(Util.map_file(filepath), '')
+    finally:
+        shutil.rmtree(directory)
@@ -0,0 +1,37 @@
+"""Tests for BinLogWriter."""
+
+import numpy
+from geomagio.binlog import BinLogWriter
+from nose.tools import assert_equals
+from obspy.core import Stats, Stream, Trace, UTCDateTime
+
+
+def __create_trace(channel, data):
+    stats = Stats()
+    stats.station = 'BOU'
+    stats.starttime = UTCDateTime('2015-01-01T00:00:00Z')
+    stats.delta = 1
+    stats.channel = channel
+    return Trace(numpy.array(data, dtype=numpy.float64), stats)
+
+
+def test_format_data():
+    """binlog_test.BinLogWriter_test.test_format_data()
+
+    Make sure only bin changes between non-missing bins are output.
+    """
+    nan = numpy.nan
+    stream = Stream([
+        __create_trace('HV', [12344, 12345, 12346, 12347, 12348]),
+        __create_trace('HB', [3, 3, 4, 4, 4]),
+        __create_trace('EV', [1000, 2000, 3000, nan, 5000]),
+        __create_trace('EB', [1, nan, 2, 2, 3]),
+        __create_trace('ZV', [1, 2, 3, 4, 5]),
+        __create_trace('ZB', [7, 7, 7, 7, 7])])
+    hbuf, ebuf, zbuf = BinLogWriter()._format_data(stream,
+            ['HV', 'HB', 'EV', 'EB', 'ZV', 'ZB'])
+    assert_equals(hbuf, '(H) 2015-01-01 00:00:02 (00002)     3 to    4' +
+            '   12.345000 to  12.346000\n')
+    assert_equals(ebuf, '(E) 2015-01-01 00:00:04 (00004)     2 to    3' +
+            '   99.999999 to   5.000000\n')
+    assert_equals(zbuf, '')
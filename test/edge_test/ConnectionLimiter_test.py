@@ -0,0 +1,27 @@
+"""Tests for ConnectionLimiter.py"""
+
+import threading
+from geomagio.edge import ConnectionLimiter
+from nose.tools import assert_equals
+
+
+def test_max_connections():
+    """edge_test.ConnectionLimiter_test.test_max_connections()
+    """
+    limiter = ConnectionLimiter(max_connections=1)
+    used = []
+
+    def use_connection(port):
+        with limiter.connection('localhost', port):
+            used.append(port)
+
+    with limiter.connection('localhost', 2060):
+        # other hosts and ports do not wait
+        use_connection(2061)
+        thread = threading.Thread(target=use_connection, args=(2060,))
+        thread.start()
+        # waits until connection is released
+        thread.join(0.1)
+        assert_equals(used, [2061])
+    thread.join()
+    assert_equals(used, [2061, 2060])
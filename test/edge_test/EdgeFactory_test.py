@@ -1,10 +1,15 @@
 """Tests for EdgeFactory.py"""
 
+import sys
+import threading
+import time
+from cStringIO import StringIO
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.stream import Stream
 from obspy.core.trace import Trace
 from geomagio.edge import EdgeFactory
-from nose.tools import assert_equals
+from geomagio.edge.EdgeFactory import _redirect_stdout_to_stderr
+from nose.tools import assert_equals, assert_raises
 
 
 def test__get_edge_network():
@@ -87,3 +92,79 @@ def dont_get_timeseries():
         'BOU', 'Expect timeseries to have stats')
     assert_equals(timeseries.select(channel='H')[0].stats.channel,
         'H', 'Expect timeseries stats channel to be equal to H')
+
+
+def test__redirect_stdout_to_stderr():
+    """edge_test.EdgeFactory_test.test__redirect_stdout_to_stderr()
+    """
+    # only output from the redirected thread is sent to stderr,
+    # and sys.stdout is restored afterwards.
+    stdout = StringIO()
+    stderr = StringIO()
+    redirected = threading.Event()
+    written = threading.Event()
+
+    def redirect():
+        with _redirect_stdout_to_stderr():
+            redirected.set()
+            written.wait(5)
+            sys.stdout.write('redirected\n')
+
+    def write():
+        redirected.wait(5)
+        sys.stdout.write('not redirected\n')
+        written.set()
+
+    original = (sys.stdout, sys.stderr)
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        threads = [threading.Thread(target=redirect),
+                threading.Thread(target=write)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        restored = sys.stdout
+    finally:
+        sys.stdout, sys.stderr = original
+    assert_equals(stdout.getvalue(), 'not redirected\n')
+    assert_equals(stderr.getvalue(), 'redirected\n')
+    assert_equals(restored is stdout, True)
+
+
+def test__get_channels():
+    """edge_test.EdgeFactory_test.test__get_channels()
+    """
+    # streams are returned in channel order,
+    # even when requests finish in a different order.
+    delays = {'H': 0.3, 'E': 0.2, 'Z': 0.1, 'F': 0}
+
+    def get_timeseries(starttime, endtime, observatory, channel, type,
+            interval):
+        time.sleep(delays[channel])
+        trace = Trace()
+        trace.stats.channel = channel
+        return Stream(trace)
+
+    factory = EdgeFactory(maxConnections=4)
+    factory._get_timeseries = get_timeseries
+    streams = factory._get_channels(None, None, 'BOU', ['H', 'E', 'Z', 'F'],
+            'variation', 'minute')
+    assert_equals([stream[0].stats.channel for stream in streams],
+            ['H', 'E', 'Z', 'F'])
+
+
+def test__get_channels__error():
+    """edge_test.EdgeFactory_test.test__get_channels__error()
+    """
+    # an error reading one channel is raised to the caller.
+    def get_timeseries(starttime, endtime, observatory, channel, type,
+            interval):
+        if channel == 'Z':
+            raise IOError('unable to read ' + channel)
+        return Stream()
+
+    factory = EdgeFactory(maxConnections=4)
+    factory._get_timeseries = get_timeseries
+    assert_raises(IOError, factory._get_channels, None, None, 'BOU',
+            ['H', 'E', 'Z', 'F'], 'variation', 'minute')
@@ -0,0 +1,393 @@
+"""Tests for IAGA2002Factory."""
+
+import numpy
+import os
+import shutil
+import tempfile
+from cStringIO import StringIO
+from geomagio import Util
+from geomagio.Util import ObjectView
+from geomagio.StreamTimeseriesFactory import StreamTimeseriesFactory
+from geomagio.iaga2002 import IAGA2002Factory
+from nose.tools import assert_equals
+from obspy.core import UTCDateTime
+from .IAGA2002Parser_test import IAGA2002_EXAMPLE
+
+
+def test_parse_string():
+    """iaga2002_test.IAGA2002Factory_test.test_parse_string()
+
+    Send an IAGA2002 file string in to parse_string to make sure a well
+    formed stream is created with proper values.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    assert_equals(len(stream), 4)
+    assert_equals(stream[0].stats.station, 'BDT')
+    assert_equals(stream[0].stats.npts, 10)
+    assert_equals(stream[0].stats.delta, 60)
+    assert_equals(stream[0].stats.starttime,
+            UTCDateTime('2013-09-01T00:00:00Z'))
+
+
+def test_parse_string__time_window():
+    """iaga2002_test.IAGA2002Factory_test.test_parse_string__time_window()
+
+    Send an IAGA2002 file string in to parse_string with a starttime and
+    endtime, and make sure only data within the window is parsed.
+    """
+    starttime = UTCDateTime('2013-09-01T00:05:00Z')
+    endtime = UTCDateTime('2013-09-01T00:07:00Z')
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE,
+            starttime=starttime, endtime=endtime)
+    assert_equals(stream[0].stats.npts, 3)
+    assert_equals(stream[0].stats.starttime, starttime)
+    assert_equals(stream[0].stats.endtime, endtime)
+    # window without data
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE,
+            starttime=UTCDateTime('2013-09-02T00:00:00Z'))
+    assert_equals(len(stream), 0)
+
+
+def test_parse_stream():
+    """iaga2002_test.IAGA2002Factory_test.test_parse_stream()
+
+    Send an IAGA2002 file handle in to parse_stream with a small block size,
+    and make sure one stream is yielded per block, only until endtime.
+    """
+    streams = list(IAGA2002Factory().parse_stream(
+            StringIO(IAGA2002_EXAMPLE),
+            endtime=UTCDateTime('2013-09-01T00:06:00Z'),
+            size=3))
+    assert_equals(len(streams), 3)
+    assert_equals(streams[0][0].stats.npts, 3)
+    assert_equals(streams[2][0].stats.starttime,
+            UTCDateTime('2013-09-01T00:06:00Z'))
+    assert_equals(streams[2][0].stats.npts, 1)
+    assert_equals(streams[2][0].stats.delta, 60)
+
+
+def test_stream_get_timeseries():
+    """iaga2002_test.IAGA2002Factory_test.test_stream_get_timeseries()
+
+    Wrap a seekable IAGA2002 file handle in a StreamTimeseriesFactory,
+    and make sure it can be read more than once.
+    """
+    factory = StreamTimeseriesFactory(
+            factory=IAGA2002Factory(),
+            stream=StringIO(IAGA2002_EXAMPLE))
+    starttime = UTCDateTime('2013-09-01T00:02:00Z')
+    endtime = UTCDateTime('2013-09-01T00:04:00Z')
+    for i in range(2):
+        stream = factory.get_timeseries(starttime, endtime)
+        assert_equals(len(stream), 4)
+        assert_equals(stream[0].stats.starttime, starttime)
+        assert_equals(stream[0].stats.endtime, endtime)
+
+
+def test_stream_get_timeseries__window():
+    """iaga2002_test.IAGA2002Factory_test.test_stream_get_timeseries__window()
+
+    Make sure seekable and other streams return only requested channels,
+    padded to the requested window.
+    """
+    starttime = UTCDateTime('2013-09-01T00:08:00Z')
+    endtime = UTCDateTime('2013-09-01T00:12:00Z')
+    for seekable in (True, False):
+        stream = StringIO(IAGA2002_EXAMPLE)
+        if not seekable:
+            stream = ObjectView({'read': stream.read})
+        factory = StreamTimeseriesFactory(
+                factory=IAGA2002Factory(),
+                stream=stream)
+        timeseries = factory.get_timeseries(starttime, endtime,
+                channels=['H', 'Z'])
+        assert_equals(sorted(trace.stats.channel for trace in timeseries),
+                ['H', 'Z'])
+        for trace in timeseries:
+            assert_equals(trace.stats.starttime, starttime)
+            assert_equals(trace.stats.endtime, endtime)
+            assert_equals(numpy.isnan(trace.data).sum(), 3)
+
+
+def test_parse_inventory():
+    """iaga2002_test.IAGA2002Factory_test.test_parse_inventory()
+
+    Parse inventory from the beginning and end of an IAGA2002 file.
+    """
+    factory = IAGA2002Factory()
+    inventory = factory.parse_inventory(IAGA2002_EXAMPLE[:2500],
+            IAGA2002_EXAMPLE[-500:])
+    assert_equals(inventory['station'], 'BDT')
+    assert_equals(inventory['channels'], ['H', 'D', 'Z', 'F'])
+    assert_equals(inventory['type'], 'variation')
+    assert_equals(inventory['interval'], 'minute')
+    assert_equals(inventory['starttime'], UTCDateTime('2013-09-01T00:00:00Z'))
+    assert_equals(inventory['endtime'], UTCDateTime('2013-09-01T00:09:00Z'))
+    # incomplete headers
+    assert_equals(factory.parse_inventory(IAGA2002_EXAMPLE[:500],
+            IAGA2002_EXAMPLE[-500:]), None)
+
+
+def test_get_inventory():
+    """iaga2002_test.IAGA2002Factory_test.test_get_inventory()
+
+    Get inventory of the files in a time interval.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'bdt20130901vmin.min'), 'w') as f:
+            f.write(IAGA2002_EXAMPLE)
+        factory = IAGA2002Factory(
+                urlTemplate='file://' + directory +
+                        '/%(obs)s%(ymd)s%(t)s%(i)s.%(i)s',
+                urlInterval=86400)
+        inventory = factory.get_inventory(
+                starttime=UTCDateTime('2013-08-31T00:00:00Z'),
+                endtime=UTCDateTime('2013-09-02T00:00:00Z'),
+                observatory='BDT')
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(len(inventory), 1)
+    assert_equals(inventory[0]['url'],
+            'file://' + directory + '/bdt20130901vmin.min')
+    assert_equals(inventory[0]['endtime'],
+            UTCDateTime('2013-09-01T00:09:00Z'))
+
+
+def test_get_url_inventory__parse_error():
+    """iaga2002_test.IAGA2002Factory_test.test_get_url_inventory__parse_error()
+
+    Verify the entire file is parsed when parse_inventory raises ValueError.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        url = 'file://' + directory + '/bdt20130901vmin.min'
+        with open(os.path.join(directory, 'bdt20130901vmin.min'), 'w') as f:
+            f.write(IAGA2002_EXAMPLE)
+        inventory = _BadInventoryIAGA2002Factory().get_url_inventory(url)
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(inventory['url'], url)
+    assert_equals(inventory['starttime'], UTCDateTime('2013-09-01T00:00:00Z'))
+    assert_equals(inventory['endtime'], UTCDateTime('2013-09-01T00:09:00Z'))
+
+
+def test_put_timeseries__update():
+    """iaga2002_test.IAGA2002Factory_test.test_put_timeseries__update()
+
+    Put data, then put overlapping and later data, and make sure the
+    updated file matches a file written all at once.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    channels = ['H', 'D', 'Z', 'F']
+    directory = tempfile.mkdtemp()
+    try:
+        factory = IAGA2002Factory(
+                urlTemplate='file://' + directory +
+                        '/%(obs)s%(ymd)s%(t)s%(i)s.%(i)s',
+                urlInterval=86400)
+        filename = os.path.join(directory, 'bdt20130901vmin.min')
+        factory.put_timeseries(stream.slice(
+                endtime=UTCDateTime('2013-09-01T00:04:00Z')),
+                channels=channels)
+        factory.put_timeseries(stream.slice(
+                starttime=UTCDateTime('2013-09-01T00:03:00Z')),
+                channels=channels)
+        with open(filename, 'r') as f:
+            updated = f.read()
+        os.remove(filename)
+        factory.put_timeseries(stream, channels=channels)
+        with open(filename, 'r') as f:
+            expected = f.read()
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(updated, expected)
+
+
+def test_put_timeseries__update_matches_rewrite():
+    """iaga2002_test.IAGA2002Factory_test.test_put_timeseries__update_matches_rewrite()
+
+    Put overlapping data, some of which is NaN, and make sure files updated
+    in place match files that are rewritten.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    channels = ['H', 'D', 'Z', 'F']
+    first = stream.slice(endtime=UTCDateTime('2013-09-01T00:05:00Z'))
+    overlap = stream.slice(starttime=UTCDateTime('2013-09-01T00:03:00Z'))
+    for trace in overlap:
+        trace.data = trace.data + 1
+    overlap.select(channel='H')[0].data[1] = numpy.nan
+    within = stream.slice(starttime=UTCDateTime('2013-09-01T00:01:00Z'),
+            endtime=UTCDateTime('2013-09-01T00:02:00Z'))
+    directory = tempfile.mkdtemp()
+    try:
+        contents = []
+        for factory_class in (IAGA2002Factory, _RewriteIAGA2002Factory):
+            factory = factory_class(
+                    urlTemplate='file://' + directory +
+                            '/%(obs)s%(ymd)s%(t)s%(i)s.%(i)s',
+                    urlInterval=86400)
+            filename = os.path.join(directory, 'bdt20130901vmin.min')
+            for data in (first, overlap, within):
+                factory.put_timeseries(data.copy(), channels=channels)
+            with open(filename, 'r') as f:
+                contents.append(f.read())
+            os.remove(filename)
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(contents[0], contents[1])
+
+
+def test_update_file__window():
+    """iaga2002_test.IAGA2002Factory_test.test_update_file__window()
+
+    Make sure only lines in the new data window are read and written.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    channels = ['H', 'D', 'Z', 'F']
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'bdt20130901vmin.min')
+        factory = IAGA2002Factory()
+        with open(filename, 'wb') as f:
+            factory.write_file(f, stream.slice(
+                    endtime=UTCDateTime('2013-09-01T00:05:00Z')), channels)
+        with open(filename, 'rb') as f:
+            content = f.read()
+        # a line before new data, that cannot be parsed
+        line = content.index('2013-09-01 00:01')
+        content = content[:line] + 'x' * 16 + content[line + 16:]
+        with open(filename, 'wb') as f:
+            f.write(content)
+        updated = factory._update_file(filename, stream.slice(
+                starttime=UTCDateTime('2013-09-01T00:04:00Z')), channels,
+                type='variation', interval='minute')
+        with open(filename, 'rb') as f:
+            updated_content = f.read()
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(updated, True)
+    assert_equals(updated_content[:len(content) - 1], content[:-1])
+    assert_equals(updated_content.count('\n'), content.count('\n') + 4)
+
+
+def test_update_file__line_endings():
+    """iaga2002_test.IAGA2002Factory_test.test_update_file__line_endings()
+
+    Make sure files with different line endings are not updated in place.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    channels = ['H', 'D', 'Z', 'F']
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'bdt20130901vmin.min')
+        factory = IAGA2002Factory()
+        out = StringIO()
+        factory.write_file_header(out, stream, channels)
+        header = out.getvalue()
+        out = StringIO()
+        factory.write_file_data(out, stream, channels)
+        data = out.getvalue().replace('\n', '\r\n')
+        with open(filename, 'wb') as f:
+            f.write(header + data)
+        updated = factory._update_file(filename, stream.copy(), channels,
+                type='variation', interval='minute')
+        with open(filename, 'rb') as f:
+            content = f.read()
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(updated, False)
+    assert_equals(content, header + data)
+
+
+def test_get_timeseries__url_workers():
+    """iaga2002_test.IAGA2002Factory_test.test_get_timeseries__url_workers()
+
+    Read several urls at the same time, some of which do not exist,
+    and make sure data is assembled in time order.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'bdt20130901vmin.min'), 'w') as f:
+            f.write(IAGA2002_EXAMPLE)
+        factory = IAGA2002Factory(
+                urlTemplate='file://' + directory +
+                        '/%(obs)s%(ymd)s%(t)s%(i)s.%(i)s',
+                urlInterval=86400,
+                urlWorkers=3)
+        starttime = UTCDateTime('2013-08-31T23:58:00Z')
+        endtime = UTCDateTime('2013-09-01T00:03:00Z')
+        stream = factory.get_timeseries(starttime, endtime,
+                observatory='BDT')
+    finally:
+        shutil.rmtree(directory)
+    expected = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    assert_equals(len(stream), 4)
+    trace = stream.select(channel='H')[0]
+    assert_equals(trace.stats.starttime, starttime)
+    assert_equals(trace.stats.npts, 6)
+    assert_equals(trace.stats.endtime, endtime)
+    assert_equals(list(trace.data[2:]),
+            list(expected.select(channel='H')[0].data[:4]))
+
+
+def test_get_timeseries__parse_workers():
+    """iaga2002_test.IAGA2002Factory_test.test_get_timeseries__parse_workers()
+
+    Parse urls in worker processes, and make sure data matches parsing
+    in this process.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'bdt20130901vmin.min'), 'w') as f:
+            f.write(IAGA2002_EXAMPLE)
+        factory = IAGA2002Factory(
+                urlTemplate='file://' + directory +
+                        '/%(obs)s%(ymd)s%(t)s%(i)s.%(i)s',
+                urlInterval=86400,
+                parseWorkers=2)
+        starttime = UTCDateTime('2013-08-31T23:58:00Z')
+        endtime = UTCDateTime('2013-09-01T00:03:00Z')
+        stream = factory.get_timeseries(starttime, endtime,
+                observatory='BDT')
+    finally:
+        shutil.rmtree(directory)
+    expected = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    assert_equals(len(stream), 4)
+    trace = stream.select(channel='H')[0]
+    assert_equals(trace.stats.starttime, starttime)
+    assert_equals(list(trace.data[2:]),
+            list(expected.select(channel='H')[0].data[:4]))
+
+
+def test_parse_string__buffer():
+    """iaga2002_test.IAGA2002Factory_test.test_parse_string__buffer()
+
+    Parse a memory mapped IAGA2002 file.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(directory, 'bdt20130901vmin.min')
+        with open(filename, 'w') as f:
+            f.write(IAGA2002_EXAMPLE)
+        stream = IAGA2002Factory().parse_string(Util.map_file(filename))
+    finally:
+        shutil.rmtree(directory)
+    expected = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    assert_equals(len(stream), 4)
+    assert_equals(stream[0].stats.starttime, expected[0].stats.starttime)
+    assert_equals(list(stream[0].data), list(expected[0].data))
+
+
+class _BadInventoryIAGA2002Factory(IAGA2002Factory):
+    """IAGA2002Factory that cannot parse inventory from head and tail."""
+
+    def parse_inventory(self, *args, **kwargs):
+        raise ValueError('unable to parse inventory')
+
+
+class _RewriteIAGA2002Factory(IAGA2002Factory):
+    """IAGA2002Factory that always rewrites existing files."""
+
+    def _update_file(self, *args, **kwargs):
+        return False
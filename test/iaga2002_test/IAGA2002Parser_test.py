@@ -1,6 +1,10 @@
 """Tests for the IAGA2002 Parser class."""
 
-from nose.tools import assert_equals
+import numpy
+from cStringIO import StringIO
+from nose.tools import assert_equals, assert_true
+from numpy.testing import assert_array_equal
+from obspy.core import UTCDateTime
 from geomagio.iaga2002 import IAGA2002Parser
 
 
@@ -106,3 +110,84 @@ def test_parse_decbas():
     parser = IAGA2002Parser()
     parser.parse(IAGA2002_EXAMPLE)
     assert_equals(parser.metadata['declination_base'], 5527)
+
+
+def test_parse__data_block():
+    """iaga2002_test.IAGA2002Parser_test.test_parse__data_block()
+
+    Call the parse method with a portion of an IAGA 2002 File,
+    where all data lines have the same width.
+    Verify the bulk decoded values match values parsed one line at a time.
+    """
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE)
+    expected = IAGA2002Parser(observatory='BDT')
+    expected._parse_channels('DATE       TIME         DOY     ' +
+            'BDTH      BDTD      BDTZ      BDTF   |')
+    for line in IAGA2002_EXAMPLE.splitlines()[-10:]:
+        expected._parse_data(line)
+    expected._post_process()
+    assert_equals(len(parser.times), 10)
+    assert_equals(parser.times, expected.times)
+    for channel in ['H', 'D', 'Z', 'F']:
+        assert_array_equal(parser.data[channel], expected.data[channel])
+    assert_equals(parser.data['H'][0], 21516.28)
+    assert_equals(parser.data['F'][-1], 52532.10)
+
+
+def test_parse__malformed_line():
+    """iaga2002_test.IAGA2002Parser_test.test_parse__malformed_line()
+
+    Call the parse method with data lines of different widths,
+    and a missing value.
+    Verify data is parsed one line at a time, and missing values are nan.
+    """
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE.replace(
+            '    -29.09  47809.75  52533.35',
+            '    -29.09  47809.75  99999.99  '))
+    assert_equals(len(parser.times), 10)
+    assert_equals(parser.data['Z'][1], 47809.75)
+    assert_true(numpy.isnan(parser.data['F'][1]))
+
+
+def test_parse__time_window():
+    """iaga2002_test.IAGA2002Parser_test.test_parse__time_window()
+
+    Call the parse method with a starttime and endtime.
+    Verify only data lines within the window are parsed,
+    whether lines are decoded in bulk or one line at a time.
+    """
+    starttime = UTCDateTime('2013-09-01T00:02:00Z')
+    endtime = UTCDateTime('2013-09-01T00:04:30Z')
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE, starttime=starttime, endtime=endtime)
+    assert_equals(len(parser.times), 3)
+    assert_equals(parser.times[0], starttime.datetime)
+    assert_array_equal(parser.data['H'], [21516.84, 21515.48, 21515.23])
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE + '  ', starttime=starttime,
+            endtime=endtime)
+    assert_equals(len(parser.times), 3)
+    assert_array_equal(parser.data['H'], [21516.84, 21515.48, 21515.23])
+
+
+def test_parse_stream__trailing_blank_line():
+    """iaga2002_test.IAGA2002Parser_test.test_parse_stream__trailing_blank_line()
+
+    Call parse_stream with an endtime, and content ending with blank lines.
+    Verify blocks ending with a blank line are parsed.
+    """
+    times = []
+    parser = IAGA2002Parser()
+    for block in parser.parse_stream(StringIO(IAGA2002_EXAMPLE + '\n  \n'),
+            size=4, endtime=UTCDateTime('2013-09-01T00:30:00Z')):
+        times.extend(block.times)
+    assert_equals(len(times), 10)
+    assert_equals(times[-1], UTCDateTime('2013-09-01T00:09:00Z').datetime)
+    times = []
+    parser = IAGA2002Parser()
+    for block in parser.parse_stream(StringIO(IAGA2002_EXAMPLE + '\n\n'),
+            size=11, endtime=UTCDateTime('2013-09-01T00:09:00Z')):
+        times.extend(block.times)
+    assert_equals(len(times), 10)
@@ -0,0 +1,72 @@
+"""Tests for IAGA2002Writer."""
+
+import numpy
+from cStringIO import StringIO
+from geomagio.Util import ObjectView
+from geomagio.iaga2002 import IAGA2002Factory, IAGA2002Writer
+from nose.tools import assert_equals
+from numpy.testing import assert_array_equal
+from .IAGA2002Parser_test import IAGA2002_EXAMPLE
+
+
+def test_format_data():
+    """iaga2002_test.IAGA2002Writer_test.test_format_data()
+
+    Format data lines, and make sure empty values are substituted for NaN.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    stream.select(channel='H')[0].data[1] = numpy.nan
+    lines = IAGA2002Writer()._format_data(stream,
+            ['H', 'D', 'Z', 'F']).splitlines()
+    assert_equals(len(lines), 10)
+    assert_equals(lines[0], '2013-09-01 00:00:00.000 244     ' +
+            '21516.28    -29.03  47809.92  52533.39')
+    assert_equals(lines[1][30:40], '  99999.99')
+
+
+def test_write():
+    """iaga2002_test.IAGA2002Writer_test.test_write()
+
+    Write and parse a stream, and make sure input is not modified.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    declination = stream.select(channel='D')[0].data.copy()
+    output = IAGA2002Writer.format(stream, ['H', 'D', 'Z', 'F'])
+    assert_array_equal(stream.select(channel='D')[0].data, declination)
+    parsed = IAGA2002Factory().parse_string(output)
+    assert_array_equal(parsed.select(channel='D')[0].data, declination)
+
+
+def test_write__blocks():
+    """iaga2002_test.IAGA2002Writer_test.test_write__blocks()
+
+    Write data lines in blocks, and make sure output is unchanged.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    out = StringIO()
+    writes = []
+
+    def write(value):
+        writes.append(value)
+        out.write(value)
+    IAGA2002Writer(block_size=3).write(ObjectView({'write': write}),
+            stream, ['H', 'D', 'Z', 'F'])
+    assert_equals(out.getvalue(),
+            IAGA2002Writer.format(stream, ['H', 'D', 'Z', 'F']))
+    # headers, comments, channels, and 4 blocks of data
+    assert_equals(len(writes), 7)
+    assert_equals(len(writes[-1].splitlines()), 1)
+
+
+def test_write__pad_channels():
+    """iaga2002_test.IAGA2002Writer_test.test_write__pad_channels()
+
+    Write fewer than four channels, and make sure empty channels are not
+    added to the input stream.
+    """
+    stream = IAGA2002Factory().parse_string(IAGA2002_EXAMPLE)
+    output = IAGA2002Writer.format(stream, ['H', 'D', 'Z'])
+    assert_equals(len(stream), 4)
+    parsed = IAGA2002Factory().parse_string(output)
+    assert_array_equal(parsed.select(channel='Z')[0].data,
+            stream.select(channel='Z')[0].data)
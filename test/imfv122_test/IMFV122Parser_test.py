@@ -76,3 +76,43 @@ def test_imfv122_post_process():
     assert_equals(parser.data['D'][1], 51.61)
     assert_equals(parser.data['Z'][1], 718.1)
     assert_equals(parser.data['F'][1], 920.2)
+
+
+def test_imfv122_parse():
+    """imfv122_test.test_imfv122_parse.
+    """
+    header = 'HER JAN0116 001 %s HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR'
+    data = '1234 5678 9101 1121 3141 5161 7181 9202'
+    parser = IMFV122Parser()
+    parser.parse('\n'.join([header % '0123', data, header % '0125', data]))
+    assert_equals(len(parser.times), 4)
+    assert_equals(UTCDateTime(parser.times[3]),
+            UTCDateTime('2016-01-01T02:06:00Z'))
+    assert_equals(parser.data['H'][2], 123.4)
+    assert_equals(parser.data['F'][3], 920.2)
+
+
+def test_imfv122_parse_inventory():
+    """imfv122_test.test_imfv122_parse_inventory.
+    """
+    header = 'HER JAN0116 001 %s HDZF R EDI 12440192 -14161 DRRRRRRRRRRRRRRR'
+    data = '1234 5678 9101 1121 3141 5161 7181 9202'
+    content = '\n'.join([header % '0123', data, header % '0125', data, data])
+    parser = IMFV122Parser()
+    assert_equals(parser.parse_inventory(content[:100], content[-160:]),
+            True)
+    assert_equals(parser.times[0], UTCDateTime('2016-01-01T02:03:00Z'))
+    assert_equals(parser.times[1], UTCDateTime('2016-01-01T02:08:00Z'))
+
+
+def test_imfv122_parse_inventory__orientations():
+    """imfv122_test.test_imfv122_parse_inventory__orientations.
+    """
+    header = 'HER JAN0116 001 %s %s R EDI 12440192 -14161 DRRRRRRRRRRRRRRR'
+    data = '1234 5678 9101 1121 3141 5161 7181 9202'
+    content = '\n'.join([header % ('0123', 'HDZF'), data,
+            header % ('0125', 'XYZF'), data, data])
+    parser = IMFV122Parser()
+    assert_equals(parser.parse_inventory(content[:100], content[-160:]),
+            True)
+    assert_equals(parser.channels, ['H', 'D', 'Z', 'F', 'X', 'Y'])
@@ -1,6 +1,9 @@
 """Tests for the IMFV283 Parser class."""
 
-from nose.tools import assert_equals
+import numpy
+from nose.tools import assert_equals, assert_true
+from numpy.testing import assert_array_equal
+from obspy.core import UTCDateTime
 from geomagio.imfv283 import IMFV283Parser, imfv283_codes
 
 
@@ -33,3 +36,141 @@ def test_parse_goes_header():
         191)
     goes_header = IMFV283Parser()._parse_goes_header(goes_data)
     assert_equals(goes_header['day'], 23)
+
+
+def test_process_ness_blocks():
+    """imfv283_test.IMFV283Parser_test.test_process_ness_blocks()
+
+    Verify several messages are decoded at once, using the byte order
+    of each observatory.
+    """
+    parser = IMFV283Parser()
+    vic = imfv283_codes.OBSERVATORIES['VIC']
+    frd = imfv283_codes.OBSERVATORIES['FRD']
+    offset = parser._get_data_offset(191)
+    ness = numpy.frombuffer(
+            IMFV283_EXAMPLE_VIC[offset:offset + 189] +
+            IMFV283_EXAMPLE_FRD[offset:offset + 189], dtype=numpy.uint8)
+    goes_data = parser._process_ness_blocks(ness.reshape(2, 63, 3),
+            [vic['swap_hdr'], frd['swap_hdr']],
+            [vic['swap_data'], frd['swap_data']])
+    assert_equals(goes_data.shape, (2, 126))
+    # header bytes
+    assert_array_equal(goes_data[:, 0:8], [
+            [23, 144, 4, 150, 134, 189, 193, 0],
+            [23, 128, 4, 154, 127, 184, 190, 64]])
+    # first sample of each channel
+    assert_array_equal(goes_data[:, 30:38], [
+            [2, 95, 20, 141, 22, 17, 28, 64],
+            [6, 196, 21, 155, 8, 213, 26, 148]])
+    goes_headers = parser._parse_goes_headers(goes_data)
+    assert_array_equal(goes_headers['day'], [23, 23])
+    assert_array_equal(goes_headers['minute'], [73, 72])
+    assert_array_equal(goes_headers['orient'], [0, 1])
+
+
+def test_parse():
+    """imfv283_test.IMFV283Parser_test.test_parse()
+
+    Verify messages are decoded into 12 sample traces for each channel.
+    """
+    parser = IMFV283Parser()
+    parser.parse(IMFV283_EXAMPLE_VIC + '\n' + IMFV283_EXAMPLE_FRD)
+    assert_equals(len(parser.stream), 8)
+    trace = parser.stream.select(station='VIC', channel='X')[0]
+    assert_equals(trace.stats.starttime, UTCDateTime('2014-01-23T01:13:00Z'))
+    assert_equals(trace.data[0], 18083.1)
+    assert_equals(trace.stats.npts, 12)
+
+
+def test_parse__window():
+    """imfv283_test.IMFV283Parser_test.test_parse__window()
+
+    Verify one trace per channel spans the requested window.
+    """
+    parser = IMFV283Parser()
+    parser.parse(IMFV283_EXAMPLE_VIC + '\n' + IMFV283_EXAMPLE_VIC,
+            starttime=UTCDateTime('2014-01-23T01:00:00Z'),
+            endtime=UTCDateTime('2014-01-23T01:59:00Z'))
+    assert_equals(len(parser.stream), 4)
+    trace = parser.stream.select(channel='X')[0]
+    assert_equals(trace.stats.starttime, UTCDateTime('2014-01-23T01:00:00Z'))
+    assert_equals(trace.stats.npts, 60)
+    assert_true(numpy.all(numpy.isnan(trace.data[:13])))
+    assert_equals(trace.data[13], 18083.1)
+    assert_true(numpy.all(numpy.isnan(trace.data[25:])))
+
+
+def test_parse__corrupt_header():
+    """imfv283_test.IMFV283Parser_test.test_parse__corrupt_header()
+
+    Verify a message with an invalid data header is skipped,
+    and the remaining messages are parsed.
+    """
+    offset = IMFV283Parser()._get_data_offset(191)
+    # day and minute of the data header are zero
+    corrupt = IMFV283_EXAMPLE_VIC[:offset] + '@@@' + \
+            IMFV283_EXAMPLE_VIC[offset + 3:]
+    parser = IMFV283Parser()
+    parser.parse(corrupt + '\n' + IMFV283_EXAMPLE_FRD)
+    assert_equals(len(parser.stream), 4)
+    assert_equals(len(parser.stream.select(station='VIC')), 0)
+    trace = parser.stream.select(station='FRD', channel='H')[0]
+    assert_equals(trace.stats.starttime, UTCDateTime('2014-01-23T01:12:00Z'))
+    assert_equals(trace.stats.npts, 12)
+
+
+def test_post_process__retransmission():
+    """imfv283_test.IMFV283Parser_test.test_post_process__retransmission()
+
+    Verify values from the latest transmission are kept,
+    unless they are missing.
+    """
+    data = numpy.zeros((2, 4, 12))
+    data[0] = 1
+    data[1] = 2
+    data[0, :, 8] = numpy.nan
+    # second packet is transmitted first
+    msg_headers = [
+        {'obs': 'VIC', 'transmission_time': '14023012800'},
+        {'obs': 'VIC', 'transmission_time': '14023012741'}
+    ]
+    goes_headers = {
+        'day': numpy.array([23, 23]),
+        'minute': numpy.array([73, 79]),
+        'orient': numpy.array([0, 0])
+    }
+    parser = IMFV283Parser()
+    parser._post_process(data, msg_headers, goes_headers)
+    trace = parser.stream.select(channel='X')[0]
+    assert_equals(trace.stats.starttime, UTCDateTime('2014-01-23T01:13:00Z'))
+    assert_array_equal(trace.data, [1] * 8 + [2] + [1] * 3 + [2] * 6)
+
+
+def test_post_process__orientations():
+    """imfv283_test.IMFV283Parser_test.test_post_process__orientations()
+
+    Verify channels shared by several orientations are combined into
+    one trace per channel.
+    """
+    data = numpy.zeros((2, 4, 12))
+    data[0] = 1
+    data[1] = 2
+    # second packet is transmitted first
+    msg_headers = [
+        {'obs': 'VIC', 'transmission_time': '14023012800'},
+        {'obs': 'VIC', 'transmission_time': '14023012741'}
+    ]
+    goes_headers = {
+        'day': numpy.array([23, 23]),
+        'minute': numpy.array([73, 79]),
+        'orient': numpy.array([0, 1])
+    }
+    parser = IMFV283Parser()
+    parser._post_process(data, msg_headers, goes_headers)
+    assert_equals([trace.stats.channel for trace in parser.stream],
+            ['X', 'Y', 'Z', 'F', 'H', 'E'])
+    trace = parser.stream.select(channel='Z')[0]
+    assert_array_equal(trace.data, [1] * 12 + [2] * 6)
+    trace = parser.stream.select(channel='X')[0]
+    assert_array_equal(trace.data, [1] * 12 + [numpy.nan] * 6)
@@ -1,9 +1,14 @@
 """Tests for PCDCPFactory."""
 
+import numpy
+import os
+import shutil
+import tempfile
 from geomagio.pcdcp import PCDCPFactory
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.stream import Stream
 from nose.tools import assert_equals
+from numpy.testing import assert_array_equal
 
 pcdcpString = \
 """BOU  2015  001  01-Jan-15  HEZF  0.01nT  File Version 2.00
@@ -13,6 +18,13 @@ pcdcpString = \
 0003  2086239    -5632  4745739  5237796
 0004  2086198    -5626  4745743  5237786"""
 
+pcdcpSecondString = \
+"""BOU  2015  001  01-Jan-15  HEZF  0.001nT  File Version 2.00
+43200  20861670    -57070  47457370  52377680
+43201  20861900    -56640  47457370  52377770
+43202  20862130    -56380  47457410  52377870
+"""
+
 
 def test_parse_string():
     """pcdcp_test.PCDCPFactory_test.test_parse_string()
@@ -27,3 +39,83 @@ def test_parse_string():
     assert_equals(stream[0].stats.station, 'BOU')
     assert_equals(stream[0].stats.starttime,
                 UTCDateTime('2015-01-01T00:00:00.000000Z'))
+
+
+def test_parse_string__channels():
+    """pcdcp_test.PCDCPFactory_test.test_parse_string__channels()
+
+    Verify only requested channels are returned.
+    """
+    stream = PCDCPFactory().parse_string(pcdcpString, channels=['H'])
+
+    assert_equals(len(stream), 1)
+    assert_equals(stream[0].stats.channel, 'H')
+    assert_array_equal(stream[0].data,
+            [20861.67, 20861.90, 20862.13, 20862.39, 20861.98])
+
+
+def test_parse_string__second():
+    """pcdcp_test.PCDCPFactory_test.test_parse_string__second()
+
+    Verify 1-second files have correct start time and sampling rate.
+    """
+    stream = PCDCPFactory().parse_string(pcdcpSecondString)
+
+    assert_equals(stream[0].stats.starttime,
+                UTCDateTime('2015-01-01T12:00:00.000000Z'))
+    assert_equals(stream[0].stats.sampling_rate, 1.0)
+    assert_equals(stream[0].stats.npts, 3)
+
+
+def test_parse_inventory():
+    """pcdcp_test.PCDCPFactory_test.test_parse_inventory()
+
+    Parse inventory from the beginning and end of a PCDCP file.
+    """
+    inventory = PCDCPFactory().parse_inventory(pcdcpSecondString[:150],
+            pcdcpSecondString[-60:], type='variation')
+    assert_equals(inventory['station'], 'BOU')
+    assert_equals(inventory['type'], 'variation')
+    assert_equals(inventory['interval'], 'second')
+    assert_equals(inventory['starttime'],
+                UTCDateTime('2015-01-01T12:00:00.000000Z'))
+    assert_equals(inventory['endtime'],
+                UTCDateTime('2015-01-01T12:00:02.000000Z'))
+
+
+def test_put_timeseries__update_matches_rewrite():
+    """pcdcp_test.PCDCPFactory_test.test_put_timeseries__update_matches_rewrite()
+
+    Put overlapping data, some of which is NaN, and make sure files updated
+    in place match files that are rewritten.
+    """
+    stream = PCDCPFactory().parse_string(pcdcpString)
+    channels = ['H', 'E', 'Z', 'F']
+    first = stream.slice(endtime=UTCDateTime('2015-01-01T00:02:00Z'))
+    overlap = stream.slice(starttime=UTCDateTime('2015-01-01T00:01:00Z'))
+    for trace in overlap:
+        trace.data = trace.data + 1
+    overlap.select(channel='H')[0].data[1] = numpy.nan
+    directory = tempfile.mkdtemp()
+    try:
+        contents = []
+        for factory_class in (PCDCPFactory, _RewritePCDCPFactory):
+            factory = factory_class(
+                    urlTemplate='file://' + directory + '/%(OBS)s%(ymd)s.min',
+                    urlInterval=86400)
+            filename = os.path.join(directory, 'BOU20150101.min')
+            for data in (first, overlap):
+                factory.put_timeseries(data.copy(), channels=channels)
+            with open(filename, 'r') as f:
+                contents.append(f.read())
+            os.remove(filename)
+    finally:
+        shutil.rmtree(directory)
+    assert_equals(contents[0], contents[1])
+
+
+class _RewritePCDCPFactory(PCDCPFactory):
+    """PCDCPFactory that always rewrites existing files."""
+
+    def _update_file(self, *args, **kwargs):
+        return False
@@ -1,6 +1,8 @@
 """Tests for the PCDCP Parser class."""
 
-from nose.tools import assert_equals
+import numpy
+from nose.tools import assert_equals, assert_true
+from numpy.testing import assert_array_equal
 from geomagio.pcdcp import PCDCPParser
 
 
@@ -18,6 +20,13 @@ BOU  2015  001  01-Jan-15  HEZF  0.01nT  File Version 2.00
 0008  2086278    -5571  4745734  5237808
 """
 
+PCDCP_SECOND_EXAMPLE = \
+"""BOU  2015  001  01-Jan-15  HEZF  0.001nT  File Version 2.00
+00000  20861670    -57070  47457370  99999990
+00001  20861900    -56640  47457370  52377770
+00002  20862130    -56380  47457410  52377870
+"""
+
 
 def test__parse_header():
     """pcdcp_test.PCDCPParser_test.test_parse_header()
@@ -33,3 +42,64 @@ def test__parse_header():
     assert_equals(parser.header['station'], 'BOU')
     assert_equals(parser.header['year'], '2015')
     assert_equals(parser.header['yearday'], '001')
+
+
+def test_parse():
+    """pcdcp_test.PCDCPParser_test.test_parse()
+
+    Parse a 1-minute file, and compare to values parsed one line at a time.
+    """
+    parser = PCDCPParser()
+    parser.parse(PCDCP_EXAMPLE.lstrip())
+    expected = PCDCPParser()
+    expected._set_channels()
+    for line in PCDCP_EXAMPLE.strip().splitlines()[1:]:
+        expected._parse_data(line)
+    expected._post_process()
+
+    assert_array_equal(parser.times, range(9))
+    for channel in ['H', 'E', 'Z', 'F']:
+        assert_array_equal(parser.data[channel], expected.data[channel])
+    assert_equals(parser.data['H'][0], 20861.67)
+    assert_equals(parser.data['E'][0], -57.07)
+
+
+def test_parse__channels():
+    """pcdcp_test.PCDCPParser_test.test_parse__channels()
+
+    Verify only requested channels are parsed.
+    """
+    parser = PCDCPParser()
+    parser.parse(PCDCP_EXAMPLE.lstrip(), channels=['H', 'Z'])
+
+    assert_equals(sorted(parser.data.keys()), ['H', 'Z'])
+    assert_equals(parser.data['Z'][2], 47457.41)
+
+
+def test_parse__second():
+    """pcdcp_test.PCDCPParser_test.test_parse__second()
+
+    Parse a 1-second file, and verify values are scaled and empty
+    values are replaced with numpy.nan.
+    """
+    parser = PCDCPParser()
+    parser.parse(PCDCP_SECOND_EXAMPLE)
+
+    assert_equals(parser.header['resolution'], '0.001nT')
+    assert_array_equal(parser.times, [0, 1, 2])
+    assert_equals(parser.data['H'][1], 20861.9)
+    assert_equals(parser.data['E'][2], -56.38)
+    assert_true(numpy.isnan(parser.data['F'][0]))
+
+
+def test_parse__malformed_line():
+    """pcdcp_test.PCDCPParser_test.test_parse__malformed_line()
+
+    Verify lines that are not fixed width are still parsed.
+    """
+    data = PCDCP_EXAMPLE.lstrip().replace('0001  2086190', '0001 2086190')
+    parser = PCDCPParser()
+    parser.parse(data)
+
+    assert_array_equal(parser.times, range(9))
+    assert_equals(parser.data['H'][1], 20861.90)
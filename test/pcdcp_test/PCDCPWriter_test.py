@@ -0,0 +1,42 @@
+"""Tests for PCDCPWriter."""
+
+import numpy
+import warnings
+from geomagio.pcdcp import PCDCPFactory, PCDCPWriter
+from nose.tools import assert_equals
+from numpy.testing import assert_array_equal
+from .PCDCPFactory_test import pcdcpString, pcdcpSecondString
+
+
+def test_format_data():
+    """pcdcp_test.PCDCPWriter_test.test_format_data()
+
+    Format minute data lines, and make sure empty values are substituted
+    for NaN, without warnings.
+    """
+    stream = PCDCPFactory().parse_string(pcdcpString)
+    stream.select(channel='H')[0].data[1] = numpy.nan
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        lines = PCDCPWriter()._format_data(stream, ['H', 'E', 'Z', 'F'],
+                stream[0].stats).splitlines()
+    assert_equals(caught, [])
+    assert_equals(len(lines), 5)
+    assert_equals(lines[0], '0000  2086167    -5707  4745737  5237768')
+    assert_equals(lines[1][4:13], '  9999999')
+    assert_equals(lines[4][0:4], '0004')
+
+
+def test_write__second():
+    """pcdcp_test.PCDCPWriter_test.test_write__second()
+
+    Write second data, and make sure second of day and scaling are used.
+    """
+    stream = PCDCPFactory().parse_string(pcdcpSecondString)
+    channels = ['H', 'E', 'Z', 'F']
+    output = PCDCPWriter.format(stream, channels)
+    assert_equals(output, pcdcpSecondString)
+    parsed = PCDCPFactory().parse_string(output)
+    for channel in channels:
+        assert_array_equal(parsed.select(channel=channel)[0].data,
+                stream.select(channel=channel)[0].data)